@@ -8,8 +8,12 @@ from src.ui import (
     render_state_settings,
     render_tech_settings,
     render_construction_projects,
+    render_marginal_value_panel,
     render_simulation_controls,
-    render_simulation_output
+    render_simulation_output,
+    render_branch_panel,
+    render_sweep_panel,
+    render_monte_carlo_panel
 )
 
 st.set_page_config(page_title="HOI4 Planner", layout="wide")
@@ -17,7 +21,7 @@ apply_css()
 st.title("Hearts of Iron IV Planner")
 initialize_session_state()
 
-tab1, tab2, tab3, tab4 = st.tabs(["State Management", "Law & Tech Settings", "Construction", "Simulation"])
+tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["State Management", "Law & Tech Settings", "Construction", "Simulation", "Parameter Sweep", "Monte Carlo"])
 
 with tab1:
     render_state_loader()
@@ -30,7 +34,15 @@ with tab2:
 
 with tab3:
     render_construction_projects()
+    render_marginal_value_panel()
 
 with tab4:
     render_simulation_controls()
-    render_simulation_output()
\ No newline at end of file
+    render_simulation_output()
+    render_branch_panel()
+
+with tab5:
+    render_sweep_panel()
+
+with tab6:
+    render_monte_carlo_panel()
\ No newline at end of file
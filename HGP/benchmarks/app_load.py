@@ -0,0 +1,161 @@
+"""Concurrent-session load test of app.py with Streamlit's AppTest, no browser needed.
+
+Run from the HGP folder:
+
+    python -m benchmarks.app_load                     # 1, 4 and 8 concurrent sessions
+    python -m benchmarks.app_load --users 16 --days 1000 --states 100
+
+Every simulated user drives its own AppTest through a scripted session: open the app, scan a
+generated history/states folder, queue buildings with the +1 buttons, simulate and rerun once
+more. The sessions run in threads of one process, as they do in a Streamlit server. AppTest
+installs a process-wide runtime for each run, so reruns take turns on a lock; CPU-bound reruns
+take turns on the GIL in a server all the same. A rerun's latency is what its user waits,
+queueing behind other sessions included, and is reported per step as percentiles. Per-session
+memory is measured separately on one traced session after a warm-up, so the tracemalloc
+overhead and the one-off import costs stay out of both figures.
+"""
+import argparse
+import gc
+import logging
+import os
+import tempfile
+import time
+import threading
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+import numpy as np
+from streamlit.testing.v1 import AppTest
+from benchmarks.parser import state_file
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+STEPS = ["open", "load_states", "select_state", "queue", "simulate", "rerun"]
+QUEUED_TYPES = ["infrastructure", "civilian_factory", "military_factory"]
+PERCENTILES = [50, 90, 99]
+# AppTest swaps streamlit's Runtime singleton in and out around every run
+_run_lock = threading.Lock()
+
+
+def _widget(elements, label: str):
+    for element in elements:
+        if element.label == label:
+            return element
+    raise LookupError(f"No widget labelled {label!r}")
+
+
+def _check(at: AppTest, step: str):
+    # st.error is the app reporting a rejected action, like a full state; only exceptions abort
+    if at.exception:
+        raise RuntimeError(f"{step}: {at.exception[0].message}")
+
+
+class Session:
+    """One scripted user; `timings` maps each step to the seconds of its reruns."""
+
+    def __init__(self, states_folder: str, clicks: int, days: int, timeout: float):
+        self.states_folder = states_folder
+        self.clicks = clicks
+        self.days = days
+        self.timeout = timeout
+        self.timings: Dict[str, List[float]] = {step: [] for step in STEPS}
+        self.at = None
+
+    def _rerun(self, step: str, action=None):
+        start = time.perf_counter()
+        with _run_lock:
+            if action is None:
+                self.at.run(timeout=self.timeout)
+            else:
+                action.run(timeout=self.timeout)
+        self.timings[step].append(time.perf_counter() - start)
+        _check(self.at, step)
+
+    def run(self) -> "Session":
+        with _run_lock:
+            self.at = AppTest.from_file(APP_PATH, default_timeout=self.timeout)
+        self._rerun("open")
+        at = self.at
+        _widget(at.selectbox, "Select Country").set_value("Manual Entry")
+        _widget(at.radio, "Load Option").set_value("Scan States Folder")
+        self._rerun("load_states")
+        _widget(at.text_input, "Path to history/states/ folder").set_value(self.states_folder)
+        self._rerun("load_states", _widget(at.button, "Scan and Load States").click())
+        state_ids = list(at.session_state.game.states)
+        if len(state_ids) < 2:
+            raise RuntimeError(f"load_states: {[e.value for e in at.error]}")
+        for i in range(self.clicks):
+            state_id = state_ids[i % len(state_ids)]
+            if at.selectbox(key="construction_state_select").value != state_id:
+                self._rerun("select_state", at.selectbox(key="construction_state_select").set_value(state_id))
+            button = at.button(key=f"add_{state_id}_{QUEUED_TYPES[i % len(QUEUED_TYPES)]}")
+            if not button.disabled:
+                self._rerun("queue", button.click())
+        _widget(at.number_input, "Days to Simulate").set_value(self.days)
+        self._rerun("simulate", _widget(at.button, "Simulate").click())
+        self._rerun("rerun")
+        return self
+
+
+def summarize(sessions: List[Session]) -> Dict[str, Dict[str, float]]:
+    """Latency percentiles in milliseconds per step over all sessions."""
+    summary = {}
+    for step in STEPS:
+        samples = np.array([t for session in sessions for t in session.timings[step]]) * 1000
+        if len(samples):
+            summary[step] = {"count": len(samples), **{f"p{p}": float(np.percentile(samples, p)) for p in PERCENTILES}, "max": float(samples.max())}
+    return summary
+
+
+def run_load(users: int, states_folder: str, clicks: int, days: int, timeout: float) -> Dict:
+    """Run `users` sessions at once; latency summary and wall time."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as executor:
+        futures = [executor.submit(Session(states_folder, clicks, days, timeout).run) for _ in range(users)]
+        sessions = [future.result() for future in futures]
+    return {"latency_ms": summarize(sessions), "wall_seconds": time.perf_counter() - start}
+
+
+def session_memory(states_folder: str, clicks: int, days: int, timeout: float) -> Dict[str, float]:
+    """MB one finished session keeps allocated, and its peak while running."""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    session = Session(states_folder, clicks, days, timeout).run()
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del session
+    return {"retained_mb": (current - baseline) / 1024 / 1024, "peak_mb": (peak - baseline) / 1024 / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test app.py with concurrent scripted sessions")
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 4, 8], help="concurrent sessions; one run per value")
+    parser.add_argument("--states", type=int, default=50, help="states in the generated history/states folder")
+    parser.add_argument("--clicks", type=int, default=30, help="+1 clicks per session")
+    parser.add_argument("--days", type=int, default=1000, help="days each session simulates")
+    parser.add_argument("--timeout", type=float, default=600, help="seconds a single rerun may take")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        states_folder = os.path.join(workdir, "states")
+        os.makedirs(states_folder)
+        with open(os.path.join(states_folder, "states.txt"), "wb") as f:
+            f.write(state_file(args.states))
+        # The app writes the result cache and the checkpoint signing key into the working directory
+        os.chdir(workdir)
+        # Imports and other one-off costs land in the warm-up session
+        Session(states_folder, args.clicks, args.days, args.timeout).run()
+        memory = session_memory(states_folder, args.clicks, args.days, args.timeout)
+        print(f"Per session: {memory['retained_mb']:.1f} MB retained, {memory['peak_mb']:.1f} MB peak")
+        for users in args.users:
+            result = run_load(users, states_folder, args.clicks, args.days, args.timeout)
+            print(f"{users} concurrent session(s): {result['wall_seconds']:.1f} s wall")
+            for step, stats in result["latency_ms"].items():
+                percentiles = "  ".join(f"p{p} {stats[f'p{p}']:8.1f}" for p in PERCENTILES)
+                print(f"  {step:13s} {stats['count']:5d} reruns  {percentiles}  max {stats['max']:8.1f} ms", flush=True)
+
+
+if __name__ == "__main__":
+    main()
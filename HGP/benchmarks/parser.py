@@ -0,0 +1,211 @@
+"""Throughput benchmark and fuzz corpus for parse_state_file.
+
+Run from the HGP folder:
+
+    python -m benchmarks.parser                          # MB/s and states/s per file shape
+    python -m benchmarks.parser --check module:function  # compare a candidate parser on the fuzz corpus
+    python -m benchmarks.parser --write-corpus DIR       # dump the fuzz corpus as .txt files
+
+A candidate parser takes (file_content: bytes, country_tag: str) like parse_state_file and must
+return identical lists of state dicts.
+"""
+import argparse
+import gc
+import importlib
+import logging
+import os
+import random
+import time
+from typing import Callable, Dict, List, Tuple
+from src.state import parse_state_file
+from src.config import STATE_CATEGORIES
+
+Parser = Callable[[bytes, str], List[Dict]]
+
+TAGS = ["GER", "FRA", "ENG", "ITA", "SOV"]
+STATE_BUILDINGS = ["industrial_complex", "arms_factory", "dockyard", "air_base", "anti_air_building", "synthetic_refinery", "fuel_silo", "radar_station", "rocket_site"]
+PROVINCE_BUILDINGS = ["naval_base", "bunker", "coastal_bunker", "supply_node", "rail_way"]
+# File shapes benchmarked by default: name -> state_file arguments
+SHAPES = {
+    "single_state": {"states": 1, "provinces": 8, "dated_blocks": 1},
+    "country": {"states": 50, "provinces": 12, "dated_blocks": 2},
+    "deep_nesting": {"states": 50, "provinces": 40, "dated_blocks": 6, "province_blocks": 12},
+    "large": {"states": 1000, "provinces": 10, "dated_blocks": 2}
+}
+
+
+def state_block(rng: random.Random, state_id: int, provinces: int, dated_blocks: int, province_blocks: int) -> str:
+    """One state in the layout of the game's history/states files."""
+    province_ids = [state_id * 100 + i for i in range(provinces)]
+    owner = rng.choice(TAGS)
+    lines = [
+        "state={",
+        f"\tid={state_id}",
+        f"\tname=\"STATE_{state_id}\" # State {state_id}",
+        f"\tmanpower = {rng.randint(1000, 5000000)}",
+        f"\tstate_category = {rng.choice(list(STATE_CATEGORIES))}",
+        f"\tlocal_supplies={rng.choice(['0.0', '0.5', '1.0', '2.0'])}",
+        "",
+        "\thistory={",
+        f"\t\towner = {owner}",
+        "\t\tvictory_points = {",
+        f"\t\t\t{province_ids[0]} {rng.randint(1, 30)}",
+        "\t\t}",
+        "\t\tbuildings = {",
+        f"\t\t\tinfrastructure = {rng.randint(1, 5)}"
+    ]
+    lines += [f"\t\t\t{building} = {rng.randint(0, 6)}" for building in rng.sample(STATE_BUILDINGS, rng.randint(1, 4))]
+    for province in rng.sample(province_ids, min(province_blocks, provinces)):
+        lines.append(f"\t\t\t{province} = {{")
+        lines += [f"\t\t\t\t{building} = {rng.randint(1, 3)}" for building in rng.sample(PROVINCE_BUILDINGS, rng.randint(1, 2))]
+        if rng.random() < 0.05:
+            lines.append("\t\t\t\tdam = 1")
+        lines.append("\t\t\t}")
+    lines.append("\t\t}")
+    lines += [f"\t\tadd_core_of = {tag}" for tag in {owner, rng.choice(TAGS)}]
+    for year in range(dated_blocks):
+        date = "1939.1.1" if year == 0 else f"{1936 + year}.{rng.randint(1, 12)}.{rng.randint(1, 28)}"
+        lines += [
+            f"\t\t{date} = {{",
+            f"\t\t\towner = {rng.choice(TAGS)}",
+            "\t\t\tbuildings = {",
+            f"\t\t\t\tarms_factory = {rng.randint(0, 8)}",
+            "\t\t\t}",
+            "\t\t}"
+        ]
+    lines += [
+        "\t}",
+        "",
+        "\tprovinces={",
+        "\t\t" + " ".join(str(p) for p in province_ids),
+        "\t}",
+        "\tallowed = {",
+        "\t\thas_dlc = \"La Resistance\"",
+        "\t}",
+        f"\tbuildings_max_level_factor={rng.choice(['1.0', '1.5', '2.0'])}",
+        "}",
+        ""
+    ]
+    return "\n".join(lines)
+
+
+def state_file(states: int, provinces: int = 10, dated_blocks: int = 2, province_blocks: int = 3, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    return "\n".join(state_block(rng, i + 1, provinces, dated_blocks, province_blocks) for i in range(states)).encode("utf-8")
+
+
+def _mutations(rng: random.Random, content: bytes) -> List[Tuple[str, bytes]]:
+    lines = content.split(b"\n")
+    cut = rng.randrange(len(lines))
+    return [
+        ("truncated", b"\n".join(lines[:cut])),
+        ("dropped_close_brace", b"\n".join(line for line in lines if line.strip() != b"}" or rng.random() > 0.2)),
+        ("dropped_open_brace", b"\n".join(line.replace(b"{", b"") if rng.random() < 0.1 else line for line in lines)),
+        ("shuffled_lines", b"\n".join(rng.sample(lines, len(lines)))),
+        ("duplicated_lines", b"\n".join(line for line in lines for _ in range(rng.choice([1, 1, 2])))),
+        ("flipped_bytes", bytes(b ^ 0x20 if rng.random() < 0.01 else b for b in content)),
+        ("invalid_utf8", content.replace(b"state_category", b"state_\xff\xfecategory", 1)),
+        ("crlf", content.replace(b"\n", b"\r\n")),
+        ("one_line", content.replace(b"\n", b" ")),
+        ("bad_numbers", content.replace(b"manpower = ", b"manpower = -x").replace(b"local_supplies=", b"local_supplies=1.2.3"))
+    ]
+
+
+# Hand-written inputs the generator does not produce
+MALFORMED = {
+    "empty": b"",
+    "only_comments": b"# state={\n#\tid=1\n",
+    "no_id": b"state={\n\tname=\"STATE_9\"\n\thistory={\n\t\towner = GER\n\t}\n}\n",
+    "history_before_state": b"history={\n\towner = GER\n}\nstate={\n\tid=1\n}\n",
+    "unclosed_state": b"state={\n\tid=3\n\thistory={\n\t\towner = GER\n",
+    "extra_closing": b"}\n}\nstate={\n\tid=4\n}\n}\n}\n",
+    "nested_states": b"state={\n\tid=5\n\tstate={\n\t\tid=6\n\t}\n}\n",
+    "inline_blocks": b"state={ id=7 history={ owner = GER buildings={ infrastructure = 3 } } }\n",
+    "huge_numbers": b"state={\n\tid=99999999999999999999\n\tmanpower = 999999999999999999999999\n\thistory={\n\t\tbuildings = {\n\t\t\tinfrastructure = 99999999999\n\t\t}\n\t}\n}\n",
+    "unknown_category": b"state={\n\tid=8\n\tstate_category = space_station\n}\n",
+    "province_outside_buildings": b"state={\n\tid=9\n\t123 = {\n\t\tnaval_base = 1\n\t}\n}\n",
+    "multiline_provinces": b"state={\n\tid=10\n\tprovinces={\n\t\t1 2 3\n\t\t4 5 6\n\t}\n}\n",
+    "victory_point_names": b"state={\n\tid=11\n\tname=STATE_11\n\thistory={\n\t\tvictory_points = {\n\t\t\t55 10 # Berlin\n\t\t}\n\t}\n}\n",
+    "nul_bytes": b"state={\n\tid=12\x00\n\tmanpower\x00= 5\n}\n"
+}
+
+
+def fuzz_corpus(seed: int = 0, files: int = 20) -> List[Tuple[str, bytes]]:
+    """Named malformed inputs: the hand-written cases plus mutations of generated state files."""
+    rng = random.Random(seed)
+    corpus = list(MALFORMED.items())
+    for i in range(files):
+        content = state_file(rng.randint(1, 5), rng.randint(1, 20), rng.randint(0, 4), rng.randint(0, 5), seed=seed + i)
+        corpus += [(f"{name}_{i}", mutated) for name, mutated in _mutations(rng, content)]
+    return corpus
+
+
+def check_parser(candidate: Parser, corpus: List[Tuple[str, bytes]], tags=(None, "GER")) -> List[str]:
+    """Corpus entries on which `candidate` returns something else than parse_state_file."""
+    mismatches = []
+    for name, content in corpus:
+        for tag in tags:
+            if candidate(content, tag) != parse_state_file(content, tag):
+                mismatches.append(f"{name} (country_tag={tag})")
+    return mismatches
+
+
+def benchmark(parser: Parser, content: bytes, repeat: int = 3) -> Dict[str, float]:
+    best = float("inf")
+    states = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        states = parser(content, None)
+        best = min(best, time.perf_counter() - start)
+    return {"seconds": best, "mb_per_second": len(content) / 1024 / 1024 / best, "states_per_second": len(states) / best}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark and fuzz parse_state_file")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement; the fastest counts")
+    parser.add_argument("--check", metavar="MODULE:FUNCTION", help="candidate parser to compare on the fuzz corpus")
+    parser.add_argument("--write-corpus", metavar="DIR", help="write the fuzz corpus to DIR")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # parse_state_file logs several lines per input line; time it with the records formatted as
+    # in the app but written to devnull, and with logging switched off
+    handlers = [handler for handler in logging.getLogger().handlers if isinstance(handler, logging.StreamHandler)]
+    with open(os.devnull, "w") as devnull:
+        streams = [handler.setStream(devnull) for handler in handlers]
+        for name, shape in SHAPES.items():
+            content = state_file(seed=args.seed, **shape)
+            logged = benchmark(parse_state_file, content, args.repeat)
+            logging.disable(logging.CRITICAL)
+            quiet = benchmark(parse_state_file, content, args.repeat)
+            logging.disable(logging.NOTSET)
+            print(
+                f"{name:14s} {len(content) / 1024:9.1f} KB  "
+                f"logging {logged['mb_per_second']:6.2f} MB/s {logged['states_per_second']:8.0f} states/s  "
+                f"no logging {quiet['mb_per_second']:6.2f} MB/s {quiet['states_per_second']:8.0f} states/s",
+                flush=True
+            )
+        for handler, stream in zip(handlers, streams):
+            handler.setStream(stream)
+
+    corpus = fuzz_corpus(args.seed)
+    if args.write_corpus:
+        os.makedirs(args.write_corpus, exist_ok=True)
+        for name, content in corpus:
+            with open(os.path.join(args.write_corpus, f"{name}.txt"), "wb") as f:
+                f.write(content)
+        print(f"Wrote {len(corpus)} files to {args.write_corpus}")
+    if args.check:
+        module, function = args.check.split(":")
+        candidate = getattr(importlib.import_module(module), function)
+        logging.disable(logging.CRITICAL)
+        mismatches = check_parser(candidate, corpus + [(name, state_file(seed=args.seed, **shape)) for name, shape in SHAPES.items()])
+        print(f"{len(mismatches)} mismatches on {len(corpus) + len(SHAPES)} inputs")
+        for mismatch in mismatches:
+            print(f"  {mismatch}")
+        raise SystemExit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Simulation benchmarks over synthetic scenarios.
+
+Run from the HGP folder:
+
+    python -m benchmarks.simulation            # quick grid, compared with benchmarks/baselines.json
+    python -m benchmarks.simulation --full     # 1-1000 states, 10-10000 units, 100-5000 days
+    python -m benchmarks.simulation --save     # store the results as the new baselines
+
+Baselines are machine specific; save them on the box the comparisons run on.
+"""
+import argparse
+import gc
+import itertools
+import json
+import logging
+import os
+import random
+import time
+import tracemalloc
+from typing import Dict, List
+from src.game import Game
+from src.construction import ConstructionProject
+from src.rules import RULES
+from src.laws import LawChange, ModifierChange
+from src.config import BUILDING_TYPES, STATE_CATEGORIES, TRADE_LAWS, ECONOMIC_LAWS
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+QUICK = {"states": [1, 100], "units": [10, 1000], "days": [100, 1000], "scheduled": [False, True]}
+FULL = {"states": [1, 10, 100, 1000], "units": [10, 100, 1000, 10000], "days": [100, 1000, 5000], "scheduled": [False, True]}
+ENGINES = {"daily": Game.simulate_days, "event_driven": Game.simulate_days_fast}
+QUEUED_TYPES = ["civilian_factory", "military_factory", "infrastructure", "dockyard", "air_base", "bunker"]
+# Differences below this many seconds are noise, whatever the ratio
+NOISE_SECONDS = 0.005
+
+
+def synthetic_states(count: int, seed: int = 0) -> List[Dict]:
+    rng = random.Random(seed)
+    states = []
+    for i in range(count):
+        category = rng.choice(list(STATE_CATEGORIES))
+        buildings = {bt: 0 for bt in BUILDING_TYPES}
+        buildings["civilian_factory"] = rng.randint(0, 4)
+        buildings["military_factory"] = rng.randint(0, 3)
+        states.append({
+            "id": i + 1,
+            "name": f"State {i + 1}",
+            "category": category,
+            "total_slots": STATE_CATEGORIES[category].slots,
+            "infrastructure": rng.randint(1, 5),
+            "buildings": buildings,
+            "state_bonus": rng.choice([0.0, 0.0, 0.1]),
+            "has_dam": rng.random() < 0.05
+        })
+    return states
+
+
+def synthetic_game(states: int, units: int, scheduled: bool, seed: int = 0) -> Game:
+    """Game with `units` queued buildings spread over `states` states, optionally with law and tech changes."""
+    rng = random.Random(seed)
+    settings = {}
+    if scheduled:
+        settings = {
+            "construction_level": 5, "construction_days": sorted(rng.sample(range(1, 3000), 5)),
+            "industry_level": 5, "industry_days": sorted(rng.sample(range(1, 3000), 5))
+        }
+    game = Game(states=synthetic_states(states, seed), **settings)
+    remaining = units
+    while remaining > 0:
+        quantity = min(remaining, rng.randint(1, 5))
+        # Appended directly so a few states can hold thousands of units regardless of slots
+        game.construction_queue.append(ConstructionProject(rng.randint(1, states), RULES.ids[rng.choice(QUEUED_TYPES)], quantity))
+        remaining -= quantity
+    if scheduled:
+        game.law_manager.law_changes = [
+            LawChange(rng.randint(1, 3000), rng.choice(["trade", "economic"]), rng.choice(list(TRADE_LAWS) + list(ECONOMIC_LAWS)))
+            for _ in range(10)
+        ]
+        game.law_manager.modifier_changes = [ModifierChange(rng.randint(1, 3000), rng.choice([-0.05, 0.05]), "benchmark") for _ in range(5)]
+    return game
+
+
+def _best_of(repeat: int, func) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_case(states: int, units: int, days: int, scheduled: bool, repeat: int = 3) -> Dict[str, Dict[str, float]]:
+    results = {}
+    results["init"] = {"seconds": _best_of(repeat, lambda: Game(states=synthetic_states(states)))}
+    game = Game(states=synthetic_states(states))
+    ids = list(game.states)
+    attempts = [(ids[i % len(ids)], QUEUED_TYPES[i % len(QUEUED_TYPES)]) for i in range(units)]
+
+    def queue_all():
+        # Attempts past a state's slots or max_buildings are rejected, which is part of the cost too
+        branch = game.fork()
+        for sid, bt in attempts:
+            branch.add_to_queue(sid, bt, 1)
+
+    seconds = _best_of(repeat, queue_all)
+    results["add_to_queue"] = {"seconds": seconds, "us_per_call": seconds / units * 1e6}
+    for name, engine in ENGINES.items():
+        games = [synthetic_game(states, units, scheduled) for _ in range(repeat)]
+        seconds = _best_of(repeat, lambda: engine(games.pop(), days))
+        tracemalloc.start()
+        engine(synthetic_game(states, units, scheduled), days)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results[name] = {"seconds": seconds, "days_per_second": days / seconds, "peak_mb": peak / 1024 / 1024}
+    return results
+
+
+def case_name(states: int, units: int, days: int, scheduled: bool) -> str:
+    return f"{states}s_{units}u_{days}d" + ("_scheduled" if scheduled else "")
+
+
+def compare(results: Dict, baselines: Dict, threshold: float) -> List[str]:
+    """Names of the measurements that got slower than their baseline by more than `threshold`."""
+    regressions = []
+    for case, measurements in results.items():
+        for name, values in measurements.items():
+            baseline = baselines.get(case, {}).get(name)
+            if baseline is None:
+                continue
+            if values["seconds"] > baseline["seconds"] * (1 + threshold) and values["seconds"] - baseline["seconds"] > NOISE_SECONDS:
+                regressions.append(f"{case} {name}: {baseline['seconds']:.4f} s -> {values['seconds']:.4f} s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Game construction, queueing and simulation")
+    parser.add_argument("--full", action="store_true", help="run the full grid instead of the quick one")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement; the fastest counts")
+    parser.add_argument("--threshold", type=float, default=0.25, help="slowdown that counts as a regression")
+    parser.add_argument("--save", action="store_true", help=f"store the results in {BASELINE_PATH}")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    grid = FULL if args.full else QUICK
+    results = {}
+    for states, units, days, scheduled in itertools.product(grid["states"], grid["units"], grid["days"], grid["scheduled"]):
+        name = case_name(states, units, days, scheduled)
+        results[name] = run_case(states, units, days, scheduled, args.repeat)
+        line = "  ".join(
+            f"{engine} {results[name][engine]['seconds'] * 1000:9.1f} ms {results[name][engine]['days_per_second']:10.0f} days/s {results[name][engine]['peak_mb']:7.1f} MB"
+            for engine in ENGINES
+        )
+        print(f"{name:28s} init {results[name]['init']['seconds'] * 1000:7.1f} ms  add {results[name]['add_to_queue']['us_per_call']:5.1f} us  {line}", flush=True)
+
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baselines = json.load(f)
+        regressions = compare(results, baselines, args.threshold)
+        print(f"{len(regressions)} regressions against {BASELINE_PATH}")
+        for regression in regressions:
+            print(f"  {regression}")
+    else:
+        baselines, regressions = {}, []
+        print(f"No baselines at {BASELINE_PATH}; run with --save to store them")
+    if args.save:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump({**baselines, **results}, f, indent=2)
+    raise SystemExit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
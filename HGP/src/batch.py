@@ -0,0 +1,293 @@
+from typing import Dict, List, Optional
+import numpy as np
+from .game import Game
+from .construction import ConstructionQueue
+from .state import base_speed_modifiers
+from .rules import RULES, CIV, MIL, DOCK, INFRA
+from .laws import construction_speed_modifiers
+from .config import CIVILIAN_FACTORY_OUTPUT, MAX_FACTORIES_PER_PROJECT, ECONOMIC_LAWS
+
+
+class BatchSimulation:
+    """Runs many Game scenarios in lockstep with the queues held in NumPy arrays.
+
+    Scenario n is packed from games[n]; after simulate_days the results can be read from the
+    arrays or written back into the games with write_back(). Allocation follows Game.simulate_days
+    day by day, so every scenario ends up with the same buildings and progress as its Game would,
+    and with the same first_funded, spare_days, metrics and waste ledger where the game keeps them.
+    """
+
+    def __init__(self, games: List[Game]):
+        if not games:
+            raise ValueError("BatchSimulation needs at least one scenario")
+        self.games = games
+        n = len(games)
+        n_states = max(len(g.states) for g in games)
+        n_queue = max(max(len(g.construction_queue) for g in games), 1)
+        n_types = len(RULES)
+
+        self.state_ids: List[List[int]] = [list(g.states) for g in games]
+        self.buildings = np.zeros((n, n_states, n_types), dtype=np.int64)
+        self.used_slots = np.zeros((n, n_states), dtype=np.int64)
+        self.infrastructure = np.zeros((n, n_states), dtype=np.int64)
+        self.max_infrastructure = np.zeros((n, n_states), dtype=np.int64)
+        self.state_bonus = np.zeros((n, n_states))
+        self.base_speed = np.zeros((n, n_states))
+        self.slot_mask = RULES.occupies_slot.astype(np.int64)
+        self.has_dam = np.zeros((n, n_states), dtype=bool)
+        self.speed_class = RULES.speed_class.astype(np.int64)
+
+        self.q_state = np.zeros((n, n_queue), dtype=np.int64)
+        self.q_type = np.zeros((n, n_queue), dtype=np.int64)
+        self.q_cost = np.zeros((n, n_queue))
+        self.q_quantity = np.zeros((n, n_queue), dtype=np.int64)
+        self.q_progress = np.zeros((n, n_queue))
+        self.q_assigned = np.zeros((n, n_queue), dtype=np.int64)
+        self.q_source = np.full((n, n_queue), -1, dtype=np.int64)  # index into the game's original queue
+        self.q_uid = np.zeros((n, n_queue), dtype=np.int64)
+        self.q_funded = np.zeros((n, n_queue), dtype=bool)  # uid already in first_funded
+        self.q_len = np.zeros(n, dtype=np.int64)
+        self.q_speed = np.zeros((n, n_queue))
+
+        self.law_speed = np.zeros((n, len(RULES.speed_classes)))
+        self.consumer_goods = np.array([g.consumer_goods_percent for g in games], dtype=float)
+        self.start_day = np.array([g.current_day for g in games], dtype=np.int64)
+        self.elapsed = 0
+        self.law_events: Dict[int, List[int]] = {}
+        # Per-game bookkeeping, copied so the games are only changed by write_back
+        self.first_funded: List[Dict[int, int]] = [dict(g.first_funded) for g in games]
+        self.spare_days: List[List[List[int]]] = [[list(stretch) for stretch in g.spare_days] for g in games]
+        self.recorders = [g.recorder.copy() if g.recorder is not None else None for g in games]
+        self.wastes = [g.waste.copy() if g.waste is not None else None for g in games]
+
+        for i, game in enumerate(games):
+            states = game.states
+            index = states.rows
+            k = len(states)
+            self.buildings[i, :k] = states.buildings
+            self.used_slots[i, :k] = states.used_slots
+            self.infrastructure[i, :k] = states.infrastructure
+            self.max_infrastructure[i, :k] = states.max_buildings[:, INFRA]
+            self.state_bonus[i, :k] = states.state_bonus
+            self.base_speed[i, :k] = states.base_speed
+            self.has_dam[i, :k] = states.has_dam
+            queue = game.construction_queue
+            self.q_len[i] = len(queue)
+            for j, project in enumerate(queue):
+                self.q_state[i, j] = index[project.state_id]
+                self.q_type[i, j] = project.type_id
+                self.q_cost[i, j] = project.cost
+                self.q_quantity[i, j] = project.quantity
+                self.q_progress[i, j] = project.progress
+                self.q_assigned[i, j] = project.factories_assigned
+                self.q_source[i, j] = j
+                self.q_uid[i, j] = project.uid
+                self.q_funded[i, j] = project.uid in game.first_funded
+            for change in game.law_manager.law_changes:
+                offset = change.day - game.current_day
+                if offset > 0:
+                    self.law_events.setdefault(offset, []).append(i)
+            self._refresh_law_speed(i, game.current_day + 1)
+        self._update_totals()
+
+    def _refresh_queue_speed(self, i: int):
+        length = self.q_len[i]
+        speed = self.base_speed[i, self.q_state[i, :length]] + self.law_speed[i, self.speed_class[self.q_type[i, :length]]]
+        self.q_speed[i, :length] = np.maximum(0.0, speed)
+
+    def _refresh_law_speed(self, i: int, day: int):
+        self.law_speed[i] = construction_speed_modifiers(self.games[i].law_manager.timeline().at(day))
+        self._refresh_queue_speed(i)
+
+    def _update_totals(self):
+        totals = self.buildings.sum(axis=1)
+        self.total_civ_factories = totals[:, CIV]
+        self.total_mil_factories = totals[:, MIL]
+        self.total_dockyards = totals[:, DOCK]
+
+    def available_civ_factories(self) -> np.ndarray:
+        consumer_goods = (self.total_civ_factories + self.total_mil_factories + self.total_dockyards) * self.consumer_goods
+        return np.maximum(0, np.floor(self.total_civ_factories - consumer_goods + 0.999)).astype(np.int64)
+
+    def simulate_days(self, days: int):
+        if days <= 0:
+            return
+        for _ in range(days):
+            self.elapsed += 1
+            for i in self.law_events.get(self.elapsed, ()):
+                self._refresh_law_speed(i, int(self.start_day[i]) + self.elapsed)
+            self._simulate_day()
+        for i, game in enumerate(self.games):
+            self.consumer_goods[i] = (
+                ECONOMIC_LAWS[game.economic_law]["consumer_goods"] +
+                (0.05 if game.stability < 50 else -0.05 if game.stability > 75 else 0.0)
+            )
+
+    def _simulate_day(self):
+        days = self.start_day + self.elapsed
+        available = self.available_civ_factories()
+        rows = np.arange(len(self.games))
+        alive = np.arange(self.q_progress.shape[1])[None, :] < self.q_len[:, None]
+        self.q_assigned[alive] = 0
+        empty = self.q_len == 0
+        stopped = empty.copy()
+        spare = np.zeros(len(self.games), dtype=bool)
+        completed_rows = set()
+        for j in range(self.q_progress.shape[1]):
+            exists = j < self.q_len
+            stopped |= exists & (available <= 0)
+            active = exists & ~stopped
+            if not active.any():
+                break
+            factories = np.where(active, np.minimum(available, MAX_FACTORIES_PER_PROJECT), 0)
+            self.q_assigned[active, j] = factories[active]
+            for i in rows[active & ~self.q_funded[:, j]]:
+                self._fund(i, j, int(days[i]))
+            self.q_progress[active, j] += factories[active] * CIVILIAN_FACTORY_OUTPUT * self.q_speed[active, j]
+            available = available - factories
+            done = active & (self.q_progress[:, j] >= self.q_cost[:, j])
+            for i in rows[done]:
+                building_type = self.q_type[i, j]
+                state = self.q_state[i, j]
+                if self.wastes[i] is not None:
+                    self.wastes[i].overflow(int(days[i]), self.state_ids[i][state], RULES.names[building_type], float(self.q_progress[i, j] - self.q_cost[i, j]))
+                if building_type == INFRA:
+                    self._raise_infrastructure(i, state)
+                else:
+                    self.buildings[i, state, building_type] += 1
+                self.used_slots[i, state] -= self.slot_mask[building_type]
+                self.q_quantity[i, j] -= 1
+                if self.q_quantity[i, j] > 0:
+                    # Grouped entries start their next unit with the same factories
+                    self.q_progress[i, j] = 0.0
+                    completed_rows.add(i)
+                    continue
+                alive[i, j] = False
+                completed_rows.add(i)
+                available[i] += factories[i]
+                # The game reassigns freed factories down the remaining queue straight away
+                for k in np.flatnonzero(alive[i]):
+                    if available[i] <= 0:
+                        break
+                    next_factories = min(available[i], MAX_FACTORIES_PER_PROJECT)
+                    self.q_assigned[i, k] = next_factories
+                    if not self.q_funded[i, k]:
+                        self._fund(i, k, int(days[i]))
+                    available[i] -= next_factories
+                spare[i] |= available[i] > 0
+        # Scenarios whose whole queue got factories leave the rest idle, as do those with an empty queue
+        unspent = (~stopped | empty) & (available > 0)
+        spare |= unspent
+        for i in rows[unspent]:
+            if self.wastes[i] is not None:
+                self._note_idle(i, int(days[i]), int(available[i]), None if empty[i] else alive[i])
+        for i in rows[spare]:
+            self._note_spare(i, int(days[i]))
+        if completed_rows:
+            for i in completed_rows:
+                self._compact(i, alive[i])
+            self._update_totals()
+        if any(recorder is not None for recorder in self.recorders):
+            available = self.available_civ_factories()
+            for i, recorder in enumerate(self.recorders):
+                if recorder is not None:
+                    self._record(i, int(days[i]), int(available[i]))
+
+    def _fund(self, i: int, j: int, day: int):
+        self.q_funded[i, j] = True
+        self.first_funded[i].setdefault(int(self.q_uid[i, j]), day)
+
+    def _note_spare(self, i: int, day: int):
+        """Game._note_spare for one day of scenario i."""
+        spare_days = self.spare_days[i]
+        if spare_days and spare_days[-1][1] == day - 1:
+            spare_days[-1][1] = day
+        else:
+            spare_days.append([day, day])
+
+    def _note_idle(self, i: int, day: int, factories: int, alive: Optional[np.ndarray]):
+        """Game._note_idle for one day of scenario i; the head is the first position still alive."""
+        head = np.flatnonzero(alive)[:1] if alive is not None else ()
+        if not len(head):
+            self.wastes[i].idle(day, factories)
+        else:
+            j = head[0]
+            cap_lost = factories * CIVILIAN_FACTORY_OUTPUT * float(self.q_speed[i, j])
+            self.wastes[i].idle(day, factories, 1, self.state_ids[i][self.q_state[i, j]], RULES.names[self.q_type[i, j]], cap_lost)
+
+    def _record(self, i: int, day: int, available: int):
+        """What Game.recorder records at the end of the day, from the arrays of scenario i."""
+        points = 0.0
+        for j in range(self.q_len[i]):
+            if self.q_assigned[i, j] == 0:
+                break
+            points += int(self.q_assigned[i, j]) * CIVILIAN_FACTORY_OUTPUT * float(self.q_speed[i, j])
+        modifiers = self.games[i]._get_timeline().at(day)
+        factory_output_modifier = modifiers["factory_output"] + modifiers["tech_factory_output"]
+        mil = int(self.total_mil_factories[i])
+        values = (
+            int(self.total_civ_factories[i]), mil, int(self.total_dockyards[i]), available,
+            points, mil * (1.0 + factory_output_modifier), int(self.q_len[i])
+        )
+        self.recorders[i].record_values(day, values)
+
+    def _raise_infrastructure(self, i: int, state: int):
+        self.infrastructure[i, state] = min(self.infrastructure[i, state] + 1, self.max_infrastructure[i, state])
+        rows = slice(state, state + 1)
+        self.base_speed[i, rows] = base_speed_modifiers(self.infrastructure[i, rows], self.state_bonus[i, rows], self.has_dam[i, rows])
+        # Positions after the current one must see the new speed on this very day, as in the game
+        self._refresh_queue_speed(i)
+
+    def _compact(self, i: int, keep: np.ndarray):
+        kept = np.flatnonzero(keep)
+        length = len(kept)
+        for column in (self.q_state, self.q_type, self.q_cost, self.q_quantity, self.q_progress, self.q_assigned, self.q_source, self.q_uid, self.q_funded, self.q_speed):
+            column[i, :length] = column[i, kept]
+        self.q_len[i] = length
+
+    def results(self) -> List[Dict]:
+        return [
+            {
+                "day": int(self.start_day[i]) + self.elapsed,
+                "total_civ_factories": int(self.total_civ_factories[i]),
+                "total_mil_factories": int(self.total_mil_factories[i]),
+                "total_dockyards": int(self.total_dockyards[i]),
+                "queue_length": int(self.q_len[i])
+            }
+            for i in range(len(self.games))
+        ]
+
+    def write_back(self):
+        """Copy buildings, queue progress, the current day and the bookkeeping back into the scenario games."""
+        for i, game in enumerate(self.games):
+            states = game.states
+            k = len(states)
+            ids = self.state_ids[i]
+            # Through the State views, so forks get their own columns and the totals and speed caches follow
+            for row, type_id in np.argwhere(states.buildings != self.buildings[i, :k]):
+                states[ids[row]].buildings[RULES.names[type_id]] = int(self.buildings[i, row, type_id])
+            for row in np.flatnonzero(states.used_slots != self.used_slots[i, :k]):
+                states[ids[row]].used_slots = int(self.used_slots[i, row])
+            for row in np.flatnonzero(states.infrastructure != self.infrastructure[i, :k]):
+                states[ids[row]].infrastructure = int(self.infrastructure[i, row])
+            projects = list(game.construction_queue)
+            queue = ConstructionQueue()
+            for j in range(self.q_len[i]):
+                project = projects[self.q_source[i, j]]
+                project.quantity = int(self.q_quantity[i, j])
+                project.progress = float(self.q_progress[i, j])
+                project.factories_assigned = int(self.q_assigned[i, j])
+                queue.append(project)
+            queue.next_uid = game.construction_queue.next_uid
+            game.construction_queue = queue
+            self.q_source[i, :self.q_len[i]] = np.arange(self.q_len[i])
+            game.current_day = int(self.start_day[i]) + self.elapsed
+            game.consumer_goods_percent = float(self.consumer_goods[i])
+            game.first_funded = dict(self.first_funded[i])
+            game.spare_days = [list(stretch) for stretch in self.spare_days[i]]
+            if self.recorders[i] is not None:
+                game.recorder = self.recorders[i].copy()
+            if self.wastes[i] is not None:
+                game.waste = self.wastes[i].copy()
+            game._update_factory_totals()
+            game._update_modifiers()
@@ -0,0 +1,144 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional
+from .game import Game
+from .metrics import MetricsRecorder
+from .checkpoints import scenario_key
+
+# Bump when a change to the simulation makes previously cached results wrong
+CACHE_VERSION = 6
+RESULT_CACHE_DIR = "result_cache"
+
+
+def scenario_hash(game: Game) -> str:
+    """Stable hex digest of everything a run from the game's current day depends on.
+
+    Project uids are left out, so a rebuilt or re-queued scenario finds the results of the original.
+    """
+    return hashlib.sha256(repr((CACHE_VERSION, scenario_key(game, uids=False))).encode()).hexdigest()
+
+
+class ResultCache:
+    """Simulation results by (scenario hash, horizon), in an in-process LRU backed by a directory.
+
+    Entries are zlib-compressed pickles written atomically, so worker processes can share the
+    directory. Once the files outgrow `max_bytes` the least recently used ones are deleted.
+    Without a directory the cache lives in memory only.
+    """
+
+    def __init__(self, directory: Optional[str] = RESULT_CACHE_DIR, max_entries: int = 64, max_bytes: int = 256 * 1024 * 1024):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._memory: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self.stats: Dict[str, int] = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def hits(self) -> int:
+        return self.stats["memory_hits"] + self.stats["disk_hits"]
+
+    def _path(self, key: tuple) -> str:
+        return os.path.join(self.directory, f"{key[0]}_{key[1]}.pkl.z")
+
+    def get(self, key: tuple):
+        blob = self._memory.get(key)
+        if blob is not None:
+            self._memory.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return pickle.loads(zlib.decompress(blob))
+        if self.directory:
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    blob = f.read()
+                os.utime(path)
+            except OSError:
+                blob = None
+            if blob is not None:
+                self._remember(key, blob)
+                self.stats["disk_hits"] += 1
+                return pickle.loads(zlib.decompress(blob))
+        self.stats["misses"] += 1
+        return None
+
+    def put(self, key: tuple, value):
+        blob = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        self._remember(key, blob)
+        if self.directory:
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(blob)
+            os.replace(temp_path, self._path(key))
+            self._evict()
+
+    def _remember(self, key: tuple, blob: bytes):
+        self._memory[key] = blob
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".pkl.z"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # Another process evicted it first
+            total -= size
+
+    @property
+    def disk_bytes(self) -> int:
+        if not self.directory:
+            return 0
+        return sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.name.endswith(".pkl.z"))
+
+    def clear(self):
+        self._memory.clear()
+        if self.directory:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".pkl.z"):
+                    os.remove(entry.path)
+
+
+def simulate_cached(game: Game, days: int, cache: ResultCache) -> Game:
+    """The game after `days` event-driven days, from the cache when the same scenario ran before.
+
+    Like Game.fork the game itself is left as it is. The returned game's recorder holds the
+    metrics of the simulated days only and it has no waste ledger.
+    """
+    key = (scenario_hash(game), days)
+    uids = [p.uid for p in game.construction_queue]
+    cached = cache.get(key)
+    if cached is None:
+        result = game.fork()
+        result.recorder = MetricsRecorder()
+        result.waste = None
+        result.first_funded = {}
+        result.spare_days = []
+        result.simulate_days_fast(days)
+        cache.put(key, (uids, result))
+    else:
+        # The cached run may have queued the same projects under other uids; hand back the caller's
+        cached_uids, result = cached
+        uid_of = dict(zip(cached_uids, uids))
+        for project in result.construction_queue:
+            project.uid = uid_of[project.uid]
+        result.first_funded = {uid_of[uid]: day for uid, day in result.first_funded.items()}
+        result.construction_queue.next_uid = game.construction_queue.next_uid
+    # Funding history is per run; keep the caller's earlier entries in front of the cached run's
+    result.first_funded = {**result.first_funded, **game.first_funded}
+    result.spare_days = [list(stretch) for stretch in game.spare_days] + result.spare_days
+    return result
@@ -0,0 +1,313 @@
+import hashlib
+import hmac
+import math
+import os
+import pickle
+import secrets
+import zlib
+from bisect import bisect_right, insort
+from dataclasses import replace
+from typing import Callable, Dict, List, Optional, Set
+from .construction import ConstructionQueue
+from .game import Game
+
+
+def _queue_key(project) -> tuple:
+    return (project.uid, project.state_id, project.type_id, project.quantity, project.progress)
+
+
+def _queue_contents(project) -> tuple:
+    return (project.state_id, project.type_id, project.quantity, project.progress)
+
+
+def _first_queue_change(before: Game, after: Game) -> Optional[int]:
+    """Index of the first queue position an edit changed, or None for an untouched queue."""
+    old = [_queue_key(p) for p in before.construction_queue]
+    new = [_queue_key(p) for p in after.construction_queue]
+    for index, (old_key, new_key) in enumerate(zip(old, new)):
+        if old_key != new_key:
+            return index
+    return None if len(old) == len(new) else min(len(old), len(new))
+
+
+def _settings_key(game: Game) -> tuple:
+    # Everything besides the queue, the schedules and tech unlocks; a change here affects the very next day
+    laws = game.law_manager
+    return (
+        game.trade_law, game.mobilization_law, game.economic_law, game.rubber_factory_max,
+        game.consumer_goods_percent, game.stability, game.war_support, tuple(sorted(game.modifiers.items())),
+        laws.trade_law, laws.mobilization_law, laws.economic_law, laws.stability, laws.war_support,
+        game.states.key()
+    )
+
+
+def scenario_key(game: Game, uids: bool = True) -> tuple:
+    """Everything a simulation from the game's current day depends on, for caching results.
+
+    With uids=False queues with the same contents give the same key whatever their project uids,
+    for results that are handed back under the caller's uids.
+    """
+    laws = game.law_manager
+    queue_key = _queue_key if uids else _queue_contents
+    return (
+        game.current_day,
+        tuple(queue_key(p) for p in game.construction_queue),
+        _settings_key(game),
+        tuple((c.day, c.law_type, c.new_law) for c in laws.law_changes),
+        tuple((c.day, c.value, c.description) for c in laws.modifier_changes),
+        game.construction_level, tuple(game.construction_days), game.industry_level, tuple(game.industry_days)
+    )
+
+
+def first_affected_day(before: Game, after: Game, first_funded: Dict[int, int], spare_days: List[List[int]]) -> float:
+    """First day on which `after`, an edited copy of `before`, can simulate differently.
+
+    A queue edit matters from the first day the old run gave factories to any project at or
+    below the edited position, or had factories to spare for a project appended there.
+    """
+    day = before.current_day
+    candidates = [math.inf]
+    index = _first_queue_change(before, after)
+    if index is not None:
+        candidates += [first_funded.get(p.uid, math.inf) for p in list(before.construction_queue)[index:]]
+        candidates += [max(first, day + 1) for first, last in spare_days if last > day][:1]
+    old_changes = {(c.day, c.law_type, c.new_law) for c in before.law_manager.law_changes}
+    new_changes = {(c.day, c.law_type, c.new_law) for c in after.law_manager.law_changes}
+    candidates += [change[0] for change in old_changes ^ new_changes]
+    old_modifiers = {(c.day, c.value, c.description) for c in before.law_manager.modifier_changes}
+    new_modifiers = {(c.day, c.value, c.description) for c in after.law_manager.modifier_changes}
+    candidates += [change[0] for change in old_modifiers ^ new_modifiers]
+    for old_level, new_level, old_days, new_days in (
+        (before.construction_level, after.construction_level, before.construction_days, after.construction_days),
+        (before.industry_level, after.industry_level, before.industry_days, after.industry_days)
+    ):
+        for i in range(max(old_level, new_level)):
+            old_unlock = old_days[i] if i < old_level else math.inf
+            new_unlock = new_days[i] if i < new_level else math.inf
+            if old_unlock != new_unlock:
+                candidates.append(min(old_unlock, new_unlock))
+    if _settings_key(before) != _settings_key(after):
+        candidates.append(day + 1)
+    return max(day + 1, min(candidates))
+
+# Saved checkpoint files are unpickled when loaded, so they carry an HMAC of their contents and
+# only files signed with this server's key are loaded. Set HGP_CHECKPOINT_KEY to share files
+# between servers; otherwise a key is generated on first use and kept in CHECKPOINT_KEY_FILE.
+CHECKPOINT_KEY_FILE = "checkpoint.key"
+SIGNATURE_SIZE = hashlib.sha256().digest_size
+
+
+def checkpoint_key() -> bytes:
+    key = os.environ.get("HGP_CHECKPOINT_KEY")
+    if key:
+        return key.encode()
+    try:
+        fd = os.open(CHECKPOINT_KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        with open(CHECKPOINT_KEY_FILE, "rb") as f:
+            return f.read()
+    key = secrets.token_bytes(32)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    return key
+
+
+class CheckpointStore:
+    """Compressed snapshots of a Game taken every `interval` days while it is simulated.
+
+    restore(day) loads the nearest checkpoint at or before `day` and replays the few days in
+    between. When the snapshots outgrow `max_bytes` every other one is dropped and the interval
+    doubles. The start and end of each run are pinned and never dropped, because the consumer
+    goods update at the end of a run cannot be replayed from an earlier checkpoint.
+    """
+
+    def __init__(self, interval: int = 30, max_bytes: int = 32 * 1024 * 1024):
+        if interval < 1:
+            raise ValueError(f"Invalid checkpoint interval: {interval}")
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.days: List[int] = []
+        self.snapshots: Dict[int, bytes] = {}
+        self.pinned: Set[int] = set()
+        self.game: Optional[Game] = None  # The live game the checkpoints belong to
+
+    @property
+    def size(self) -> int:
+        return sum(len(blob) for blob in self.snapshots.values())
+
+    @property
+    def first_day(self) -> Optional[int]:
+        return self.days[0] if self.days else None
+
+    @property
+    def last_day(self) -> Optional[int]:
+        return self.days[-1] if self.days else None
+
+    def clear(self):
+        self.days.clear()
+        self.snapshots.clear()
+        self.pinned.clear()
+        self.game = None
+
+    def capture(self, game: Game, pinned: bool = False):
+        day = game.current_day
+        if day not in self.snapshots:
+            insort(self.days, day)
+        self.snapshots[day] = zlib.compress(pickle.dumps(game, protocol=pickle.HIGHEST_PROTOCOL))
+        if pinned:
+            self.pinned.add(day)
+        while self.size > self.max_bytes and self._thin():
+            pass
+
+    def _thin(self) -> bool:
+        """Drop every other unpinned checkpoint; False when nothing is left to drop."""
+        unpinned = [day for day in self.days if day not in self.pinned]
+        dropped = unpinned[1::2] if len(unpinned) > 1 else unpinned
+        if not dropped:
+            return False
+        for day in dropped:
+            del self.snapshots[day]
+        self.days = [day for day in self.days if day in self.snapshots]
+        self.interval *= 2
+        return True
+
+    def discard_after(self, day: int):
+        """Forget checkpoints past `day`; they belong to a timeline the game has left."""
+        for stale in self.days[bisect_right(self.days, day):]:
+            del self.snapshots[stale]
+            self.pinned.discard(stale)
+        self.days = self.days[:bisect_right(self.days, day)]
+
+    def run(self, game: Game, days: int, fast: bool = True, condition: Optional[Callable[[Game], bool]] = None) -> Optional[int]:
+        """Simulate `days` days like Game.simulate_days(_fast), checkpointing along the way.
+
+        With a condition the run stops early like Game.simulate_until, and the day the condition
+        was met is returned.
+        """
+        if condition is not None and condition(game):
+            return game.current_day
+        if days <= 0:
+            return None
+        if game is not self.game:
+            self.clear()
+            self.game = game
+        self.discard_after(game.current_day)
+        self.capture(game, pinned=True)
+        end_day = game.current_day + days
+        reached = False
+        while game.current_day < end_day and not reached:
+            boundary = (game.current_day // self.interval + 1) * self.interval
+            step = min(boundary, end_day) - game.current_day
+            if fast:
+                reached = game._advance_fast(step, condition)
+            else:
+                reached = game._advance(step, condition)
+            if game.current_day < end_day and not reached:
+                self.capture(game)
+        game._update_consumer_goods()
+        self.capture(game, pinned=True)
+        return game.current_day if reached else None
+
+    def _load(self, day: int) -> Game:
+        index = bisect_right(self.days, day) - 1
+        if index < 0 or day > self.days[-1]:
+            raise ValueError(f"No checkpoint covers day {day}")
+        checkpoint_day = self.days[index]
+        game = pickle.loads(zlib.decompress(self.snapshots[checkpoint_day]))
+        game._advance_fast(day - checkpoint_day)
+        return game
+
+    def restore(self, day: int) -> Game:
+        """Game as it was on `day`, rebuilt from the nearest earlier checkpoint."""
+        self.game = self._load(day)
+        return self.game
+
+    def resimulate(self, game: Game, fast: bool = True) -> int:
+        """Carry the edits made to a restored game through to the last simulated day.
+
+        Only the days from the first one the edits affect are simulated again, starting from the
+        checkpointed state just before it. Returns the day the simulation resumed from.
+        """
+        if game is not self.game or not self.days or game.current_day not in range(self.first_day, self.last_day + 1):
+            raise ValueError("The game is not a restored checkpoint of this store")
+        end_day = self.last_day
+        # The final checkpoint knows every project's first funded day of the run being edited
+        final = self._load(end_day)
+        before = self._load(game.current_day)
+        affected = first_affected_day(before, game, final.first_funded, final.spare_days)
+        resume = int(min(affected - 1, end_day))
+        if resume > game.current_day:
+            # Checkpoints up to the resume day only lack the edits themselves, so patch them in place
+            stale = self.days[bisect_right(self.days, game.current_day):bisect_right(self.days, resume)]
+            for day in stale:
+                checkpoint = pickle.loads(zlib.decompress(self.snapshots[day]))
+                self._transplant(before, game, checkpoint)
+                self.snapshots[day] = zlib.compress(pickle.dumps(checkpoint, protocol=pickle.HIGHEST_PROTOCOL))
+            if stale:
+                game = self._load(resume)
+            else:
+                game._advance_fast(resume - game.current_day)
+        run_ends = [day for day in sorted(self.pinned) if day > resume]
+        self.game = game
+        self.discard_after(resume)
+        for run_end in run_ends:
+            self.run(game, run_end - game.current_day, fast=fast)
+        if game.current_day == end_day and end_day not in self.snapshots:
+            self.capture(game, pinned=True)
+        return resume
+
+    @staticmethod
+    def _transplant(before: Game, edited: Game, game: Game):
+        """Apply the difference between `before` and `edited` to `game`, a later state of `before`
+        from before the first affected day.
+
+        Projects below the first edited queue position have not been given factories by then,
+        so the edited tail can replace the old one as is.
+        """
+        index = _first_queue_change(before, edited)
+        if index is not None:
+            projects = list(edited.construction_queue)
+            kept = {p.uid for p in projects[:index]}
+            queue = ConstructionQueue([p for p in game.construction_queue if p.uid in kept])
+            for project in projects[index:]:
+                queue.append(replace(project, factories_assigned=0))
+            queue.next_uid = edited.construction_queue.next_uid
+            game.construction_queue = queue
+        for sid, state in edited.states.items():
+            delta = state.used_slots - before.states[sid].used_slots
+            if delta:
+                game.states[sid].used_slots += delta
+        game.law_manager.law_changes = edited.law_manager.law_changes
+        game.law_manager.modifier_changes = edited.law_manager.modifier_changes
+        game.construction_level, game.construction_days = edited.construction_level, list(edited.construction_days)
+        game.industry_level, game.industry_days = edited.industry_level, list(edited.industry_days)
+
+    def dumps(self, key: Optional[bytes] = None) -> bytes:
+        """The snapshots as bytes for save() or a download, signed with `key` or checkpoint_key()."""
+        payload = pickle.dumps(
+            {"interval": self.interval, "max_bytes": self.max_bytes, "snapshots": self.snapshots, "pinned": self.pinned},
+            protocol=pickle.HIGHEST_PROTOCOL
+        )
+        return hmac.new(key or checkpoint_key(), payload, hashlib.sha256).digest() + payload
+
+    @classmethod
+    def loads(cls, blob: bytes, key: Optional[bytes] = None) -> "CheckpointStore":
+        """Store from dumps() output; raises ValueError unless it was signed with the same key."""
+        signature, payload = blob[:SIGNATURE_SIZE], blob[SIGNATURE_SIZE:]
+        if not hmac.compare_digest(signature, hmac.new(key or checkpoint_key(), payload, hashlib.sha256).digest()):
+            raise ValueError("Checkpoint file was not saved by this server or has been modified")
+        data = pickle.loads(payload)
+        store = cls(interval=data["interval"], max_bytes=data["max_bytes"])
+        store.snapshots = data["snapshots"]
+        store.pinned = data["pinned"]
+        store.days = sorted(store.snapshots)
+        return store
+
+    def save(self, path: str, key: Optional[bytes] = None):
+        with open(path, "wb") as f:
+            f.write(self.dumps(key))
+
+    @classmethod
+    def load(cls, path: str, key: Optional[bytes] = None) -> "CheckpointStore":
+        with open(path, "rb") as f:
+            return cls.loads(f.read(), key)
@@ -0,0 +1,79 @@
+from typing import Optional, Union
+from .dates import date_to_day
+from .rules import RULES
+
+
+class Condition:
+    """Stop condition for Game.simulate_until, checked at the end of every simulated day.
+
+    The event-driven engine only checks conditions after days on which something happened, so a
+    condition that can turn true on a quiet day has to say when through deadline().
+    """
+
+    def __call__(self, game) -> bool:
+        raise NotImplementedError
+
+    def deadline(self, game) -> Optional[int]:
+        """Day by which the condition holds even if nothing else happens."""
+        return None
+
+
+class QueueEmpty(Condition):
+    def __call__(self, game) -> bool:
+        return not game.construction_queue
+
+    def __repr__(self):
+        return "queue empty"
+
+
+class CivilianFactoriesAtLeast(Condition):
+    def __init__(self, count: int):
+        self.count = count
+
+    def __call__(self, game) -> bool:
+        return game.total_civ_factories >= self.count
+
+    def __repr__(self):
+        return f"{self.count} civilian factories"
+
+
+class StateSlotsFull(Condition):
+    def __init__(self, state_id: int):
+        self.state_id = state_id
+
+    def __call__(self, game) -> bool:
+        states = game.states
+        row = states.rows[self.state_id]
+        return int(states.buildings[row, RULES.occupies_slot].sum()) >= int(states.total_slots[row])
+
+    def __repr__(self):
+        return f"state {self.state_id} slots full"
+
+
+class DateReached(Condition):
+    def __init__(self, date: Union[str, int]):
+        self.day = date_to_day(date) if isinstance(date, str) else date
+
+    def __call__(self, game) -> bool:
+        return game.current_day >= self.day
+
+    def deadline(self, game) -> Optional[int]:
+        return self.day
+
+    def __repr__(self):
+        return f"day {self.day}"
+
+
+class AnyOf(Condition):
+    def __init__(self, *conditions: Condition):
+        self.conditions = conditions
+
+    def __call__(self, game) -> bool:
+        return any(condition(game) for condition in self.conditions)
+
+    def deadline(self, game) -> Optional[int]:
+        deadlines = [d for d in (c.deadline(game) for c in self.conditions) if d is not None]
+        return min(deadlines) if deadlines else None
+
+    def __repr__(self):
+        return " or ".join(repr(c) for c in self.conditions)
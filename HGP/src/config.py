@@ -82,6 +82,10 @@ CIVILIAN_FACTORY_OUTPUT = 5.0  # Construction points per day per factory
 MAX_FACTORIES_PER_PROJECT = 15
 INFRASTRUCTURE_SPEED_BONUS = 0.20  # +20% per infrastructure level
 
+# Calendar: day 0 is 1936.1.1 and HOI4 has no leap years
+START_YEAR = 1936
+MONTH_DAYS = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+
 # Technology effects
 TECHNOLOGY_EFFECTS = {
     "construction1": {"construction_speed": 0.10},
@@ -1,17 +1,199 @@
-from dataclasses import dataclass
-from typing import Optional
-from .config import BUILDING_TYPES, BUILDING_COSTS
+from dataclasses import dataclass, field, replace
+from typing import Iterator, List, Optional
+from .rules import RULES
 
-@dataclass
+@dataclass(slots=True)
 class ConstructionProject:
     state_id: int
-    building_type: str
-    quantity: int
-    cost: float  # Total cost in construction points
-    progress: float = 0.0  # Progress in construction points
+    type_id: int  # Building type id in RULES; building_type has the name
+    quantity: int  # Units still to build; they are built one after another
+    progress: float = 0.0  # Progress on the unit currently being built
     factories_assigned: int = 0  # Number of civilian factories working on this project
+    uid: int = 0  # Identifies the project across forks and checkpoints; set by ConstructionQueue
+    cost: float = field(init=False)  # Cost of one unit in construction points, from RULES
+    _prev: Optional["ConstructionProject"] = field(default=None, init=False, repr=False, compare=False)
+    _next: Optional["ConstructionProject"] = field(default=None, init=False, repr=False, compare=False)
+    _owner: Optional["ConstructionQueue"] = field(default=None, init=False, repr=False, compare=False)  # Queue it is linked into
 
     def __post_init__(self):
-        if self.building_type not in BUILDING_TYPES:
-            raise ValueError(f"Invalid building type: {self.building_type}")
-        self.cost = BUILDING_COSTS.get(self.building_type, 0) * self.quantity
\ No newline at end of file
+        if not 0 <= self.type_id < len(RULES):
+            raise ValueError(f"Invalid building type id: {self.type_id}")
+        if self.quantity < 1:
+            raise ValueError(f"Invalid quantity: {self.quantity}")
+        self.cost = float(RULES.cost[self.type_id])
+
+    @property
+    def building_type(self) -> str:
+        return RULES.names[self.type_id]
+
+    @property
+    def remaining_cost(self) -> float:
+        return self.cost * self.quantity - self.progress
+
+    # Pickle without the links; ConstructionQueue relinks its projects, which keeps deep queues
+    # from recursing through _next
+    def __getstate__(self):
+        return (self.state_id, self.type_id, self.quantity, self.cost, self.progress, self.factories_assigned, self.uid)
+
+    def __setstate__(self, state):
+        self.state_id, self.type_id, self.quantity, self.cost, self.progress, self.factories_assigned, self.uid = state
+        self._prev = self._next = self._owner = None
+
+
+class ConstructionQueue:
+    """Doubly linked construction queue.
+
+    Removing or reordering a project you already hold is O(1), so completions deep in a long
+    queue never shift the rest of it. Positional access (queue[i], insert, pop) walks the links.
+    """
+
+    def __init__(self, projects: Optional[List[ConstructionProject]] = None):
+        self.head: Optional[ConstructionProject] = None
+        self.tail: Optional[ConstructionProject] = None
+        self._length = 0
+        self._assigned: List[ConstructionProject] = []
+        self.next_uid = 1
+        for project in projects or []:
+            self.append(project)
+
+    def __getstate__(self):
+        return list(self), self._assigned, self.next_uid
+
+    def __setstate__(self, state):
+        projects, assigned, next_uid = state
+        self.__init__()
+        for project in projects:
+            self._link_before(project, None)
+        self._assigned = assigned
+        self.next_uid = next_uid
+
+    def copy(self) -> "ConstructionQueue":
+        queue = ConstructionQueue([replace(project) for project in self])
+        queue.next_uid = self.next_uid
+        return queue
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __bool__(self) -> bool:
+        return self._length > 0
+
+    def __iter__(self) -> Iterator[ConstructionProject]:
+        project = self.head
+        while project is not None:
+            # Read the successor first so the current project may be removed while iterating
+            next_project = project._next
+            yield project
+            project = next_project
+
+    def __getitem__(self, index: int) -> ConstructionProject:
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("construction queue index out of range")
+        for i, project in enumerate(self):
+            if i == index:
+                return project
+
+    def index(self, project: ConstructionProject) -> int:
+        for i, queued in enumerate(self):
+            if queued is project:
+                return i
+        raise ValueError("project is not in the construction queue")
+
+    def _contains(self, project: ConstructionProject) -> bool:
+        return project._owner is self
+
+    def _link_before(self, project: ConstructionProject, successor: Optional[ConstructionProject]):
+        predecessor = successor._prev if successor is not None else self.tail
+        project._prev = predecessor
+        project._next = successor
+        project._owner = self
+        if predecessor is None:
+            self.head = project
+        else:
+            predecessor._next = project
+        if successor is None:
+            self.tail = project
+        else:
+            successor._prev = project
+        self._length += 1
+
+    def _unlink(self, project: ConstructionProject):
+        if project._prev is None:
+            self.head = project._next
+        else:
+            project._prev._next = project._next
+        if project._next is None:
+            self.tail = project._prev
+        else:
+            project._next._prev = project._prev
+        project._prev = project._next = project._owner = None
+        self._length -= 1
+
+    def _register(self, project: ConstructionProject):
+        if project.uid == 0:
+            project.uid = self.next_uid
+        self.next_uid = max(self.next_uid, project.uid + 1)
+        if project.factories_assigned:
+            self._assigned.append(project)
+
+    def append(self, project: ConstructionProject):
+        self._link_before(project, None)
+        self._register(project)
+
+    def insert(self, index: int, project: ConstructionProject):
+        self._link_before(project, self[index] if index < self._length else None)
+        self._register(project)
+
+    def remove(self, project: ConstructionProject):
+        if not self._contains(project):
+            raise ValueError("project is not in the construction queue")
+        self._unlink(project)
+
+    def pop(self, index: int = -1) -> ConstructionProject:
+        project = self[index]
+        self._unlink(project)
+        return project
+
+    def move_up(self, project: ConstructionProject):
+        predecessor = project._prev
+        if predecessor is not None:
+            self._unlink(project)
+            self._link_before(project, predecessor)
+
+    def move_down(self, project: ConstructionProject):
+        successor = project._next
+        if successor is not None:
+            self._unlink(project)
+            self._link_before(project, successor._next)
+
+    def move_to_front(self, project: ConstructionProject):
+        if project is not self.head:
+            self._unlink(project)
+            self._link_before(project, self.head)
+
+    def move_to_back(self, project: ConstructionProject):
+        if project is not self.tail:
+            self._unlink(project)
+            self._link_before(project, None)
+
+    def assign(self, project: ConstructionProject, factories: int):
+        project.factories_assigned = factories
+        self._assigned.append(project)
+
+    def clear_assignments(self):
+        """Reset factories_assigned on every project assigned since the last reset."""
+        for project in self._assigned:
+            project.factories_assigned = 0
+        self._assigned.clear()
+
+    def reassign(self, available_factories: int, max_per_project: int):
+        """Give each project up to max_per_project factories from the top until none are left."""
+        self.clear_assignments()
+        for project in self:
+            if available_factories <= 0:
+                break
+            factories = min(available_factories, max_per_project)
+            self.assign(project, factories)
+            available_factories -= factories
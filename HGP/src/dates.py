@@ -0,0 +1,25 @@
+from itertools import accumulate
+from .config import START_YEAR, MONTH_DAYS
+
+# Day of the year on which each month starts
+MONTH_STARTS = [0] + list(accumulate(MONTH_DAYS))[:-1]
+
+
+def day_to_date(day: int) -> str:
+    """HOI4 date such as 1939.9.1 for a simulation day; day 0 is 1936.1.1."""
+    if day < 0:
+        raise ValueError(f"Invalid day: {day}")
+    year, day_of_year = divmod(day, 365)
+    month = next(m for m in range(11, -1, -1) if MONTH_STARTS[m] <= day_of_year)
+    return f"{START_YEAR + year}.{month + 1}.{day_of_year - MONTH_STARTS[month] + 1}"
+
+
+def date_to_day(date: str) -> int:
+    """Simulation day of a HOI4 date written year.month.day."""
+    try:
+        year, month, day = (int(part) for part in date.strip().split("."))
+    except ValueError:
+        raise ValueError(f"Invalid date: {date}")
+    if year < START_YEAR or not 1 <= month <= 12 or not 1 <= day <= MONTH_DAYS[month - 1]:
+        raise ValueError(f"Invalid date: {date}")
+    return (year - START_YEAR) * 365 + MONTH_STARTS[month - 1] + day - 1
@@ -0,0 +1,145 @@
+import json
+import logging
+import math
+from dataclasses import dataclass
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+from .game import Game
+from .metrics import MetricsRecorder
+from .rules import RULES, CIV, MIL, DOCK, INFRA
+from .state import base_speed_modifiers
+from .laws import construction_speed_modifiers
+from .config import CIVILIAN_FACTORY_OUTPUT, MAX_FACTORIES_PER_PROJECT
+
+# Estimate fields and the MetricsRecorder columns they approximate
+COMPARED_METRICS = {
+    "civilian_factories": "total_civ_factories",
+    "military_factories": "total_mil_factories",
+    "dockyards": "total_dockyards",
+    "military_production": "military_production"
+}
+
+
+@dataclass
+class FluidEstimate:
+    days: np.ndarray
+    civilian_factories: np.ndarray
+    military_factories: np.ndarray
+    dockyards: np.ndarray
+    military_production: np.ndarray
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {metric: getattr(self, metric) for metric in COMPARED_METRICS},
+            index=pd.Index(self.days, name="day")
+        )
+
+
+def fluid_estimate(game: Game, days: int = 3650, step: int = 7) -> FluidEstimate:
+    """Continuous approximation of simulating `days` days, sampled every `step` days.
+
+    Available factories pour construction points into the queue in order, limited to 15 per
+    remaining entry, and a building counts fractionally while it is under construction, so the
+    factory totals grow smoothly instead of in whole units. The game itself is not modified.
+    """
+    timeline = game._get_timeline()
+    projects = list(game.construction_queue)
+    quantities = np.array([p.quantity for p in projects], dtype=np.int64)
+    # One element per unit still to build; plain lists are faster than arrays for the scalar loop below
+    unit_type = np.repeat([p.type_id for p in projects], quantities).tolist()
+    unit_speed_class = RULES.speed_class[unit_type].tolist()
+    unit_state = np.repeat([game.states.rows[p.state_id] for p in projects], quantities).tolist()
+    unit_cost = np.repeat([p.cost for p in projects], quantities).astype(float).tolist()
+    unit_done = [0.0] * len(unit_type)
+    for first_unit, project in zip(np.cumsum(quantities) - quantities, projects):
+        unit_done[first_unit] = project.progress / project.cost
+    entries_left = np.repeat(np.arange(len(projects), 0, -1), quantities).tolist()
+
+    states = game.states
+    infrastructure = states.infrastructure.copy()
+    max_infrastructure = states.max_buildings[:, INFRA]
+    base_speed = states.base_speed.tolist()
+    counts = {CIV: float(game.total_civ_factories), MIL: float(game.total_mil_factories), DOCK: float(game.total_dockyards)}
+
+    samples = list(range(game.current_day, game.current_day + days, step)) + [game.current_day + days]
+    result = {metric: np.empty(len(samples)) for metric in COMPARED_METRICS}
+    k = 0
+    for i, day in enumerate(samples):
+        if i:
+            values = timeline.at(day)
+            law_speed = construction_speed_modifiers(values)
+            budget = (day - samples[i - 1]) * CIVILIAN_FACTORY_OUTPUT  # construction points per factory over the step
+            while budget > 0 and k < len(unit_type):
+                consumer_goods = (counts[CIV] + counts[MIL] + counts[DOCK]) * game.consumer_goods_percent
+                factories = min(max(0.0, counts[CIV] - consumer_goods), MAX_FACTORIES_PER_PROJECT * entries_left[k])
+                if factories <= 0:
+                    break
+                building_type = unit_type[k]
+                speed = max(0.0, base_speed[unit_state[k]] + law_speed[unit_speed_class[k]])
+                needed = (1.0 - unit_done[k]) * unit_cost[k] / (factories * speed) if speed > 0 else math.inf
+                if budget < needed:
+                    progress = budget / needed * (1.0 - unit_done[k])
+                    budget = 0.0
+                else:
+                    progress = 1.0 - unit_done[k]
+                    budget -= needed
+                unit_done[k] += progress
+                if building_type in counts:
+                    counts[building_type] += progress
+                if budget > 0:
+                    if building_type == INFRA:
+                        row = unit_state[k]
+                        rows = slice(row, row + 1)
+                        infrastructure[row] = min(infrastructure[row] + 1, max_infrastructure[row])
+                        base_speed[row] = float(base_speed_modifiers(infrastructure[rows], states.state_bonus[rows], states.has_dam[rows])[0])
+                    k += 1
+        values = timeline.at(day)
+        result["civilian_factories"][i] = counts[CIV]
+        result["military_factories"][i] = counts[MIL]
+        result["dockyards"][i] = counts[DOCK]
+        result["military_production"][i] = counts[MIL] * (1.0 + values["factory_output"] + values["tech_factory_output"])
+    return FluidEstimate(days=np.array(samples), **result)
+
+
+def estimate_error(game: Game, days: int = 3650, step: int = 7) -> Dict[str, Dict[str, float]]:
+    """Compare fluid_estimate with the discrete engine on a fork of the game."""
+    estimate = fluid_estimate(game, days, step)
+    exact = game.fork()
+    exact.recorder = MetricsRecorder()
+    exact.simulate_days_fast(days)
+    report = {}
+    for metric, column in COMPARED_METRICS.items():
+        sampled = np.array([exact.recorder.value(column, int(day)) for day in estimate.days[1:]], dtype=float)
+        error = np.abs(getattr(estimate, metric)[1:] - sampled)
+        report[metric] = {
+            "max_abs_error": float(error.max()) if len(error) else 0.0,
+            "mean_abs_error": float(error.mean()) if len(error) else 0.0,
+            "final_exact": float(sampled[-1]) if len(sampled) else 0.0,
+            "final_estimate": float(getattr(estimate, metric)[-1])
+        }
+    return report
+
+
+def shipped_plans(settings: Dict) -> Dict[str, List[Dict]]:
+    """Queues used to report the estimate's error: every free slot filled with one building type."""
+    plans = {}
+    for building_type in ("civilian_factory", "military_factory"):
+        game = Game(states=settings["states"])
+        plans[building_type] = [
+            {"state_id": state.id, "building_type": building_type, "quantity": state.total_slots - state.used_slots}
+            for state in game.states.values() if state.total_slots > state.used_slots
+        ]
+    return plans
+
+
+if __name__ == "__main__":
+    from .sweep import build_game
+    logging.disable(logging.INFO)
+    with open("settings.json") as f:
+        settings = json.load(f)
+    for name, queue in shipped_plans(settings).items():
+        report = estimate_error(build_game(settings, queue))
+        print(f"{name} plan, 3650 days:")
+        for metric, errors in report.items():
+            print(f"  {metric:20s} " + "  ".join(f"{k}={v:.2f}" for k, v in errors.items()))
@@ -1,17 +1,24 @@
-from typing import Dict, List
-from .construction import ConstructionProject
+import math
+from typing import Callable, Dict, List, Optional, Tuple
+from .construction import ConstructionProject, ConstructionQueue
 from .laws import LawManager
-from .state import State
+from .timeline import ModifierTimeline, compile_game_timeline
+from .metrics import MetricsRecorder
+from .waste import WasteLedger
+from .conditions import Condition
+from .state import StateTable
+from .rules import RULES, INFRA, CIV, MIL, DOCK
 from .config import (
-    BUILDING_COSTS, CIVILIAN_FACTORY_OUTPUT, BUILDING_TYPES, 
-    DEFAULT_MAX_BUILDINGS, MAX_FACTORIES_PER_PROJECT, 
-    INFRASTRUCTURE_SPEED_BONUS, TECHNOLOGY_EFFECTS, ECONOMIC_LAWS
+    CIVILIAN_FACTORY_OUTPUT, BUILDING_TYPES, MAX_FACTORIES_PER_PROJECT, ECONOMIC_LAWS
 )
 
 class GameError(Exception):
     pass
 
 class Game:
+    # Recount the factory totals after every simulated day and fail if the tracked values drifted
+    debug = False
+
     def __init__(
         self,
         states: List[dict],
@@ -29,7 +36,8 @@ class Game:
         war_support: float = 0.0,
         modifiers: Dict[str, float] = None
     ):
-        self.states: Dict[int, State] = {s['id']: State(**s) for s in states}
+        self.states = StateTable(states)
+        self.states.owner = self
         self.industry_level = min(max(0, industry_level), 5)
         self.construction_level = min(max(0, construction_level), 5)
         self.industry_days = industry_days
@@ -43,101 +51,378 @@ class Game:
         self.stability = stability
         self.war_support = war_support
         self.modifiers = modifiers or {"global": 0.0, "stability": 0.0, "war_support": 0.0, **{bt: 0.0 for bt in BUILDING_TYPES}}
-        self.construction_queue: List[ConstructionProject] = []
+        self.construction_queue = ConstructionQueue()
+        self._timeline: Optional[ModifierTimeline] = None
+        self._timeline_version = -1
+        self._modifier_segment: Optional[int] = None
+        self._speed_cache: Dict[Tuple[int, str], Tuple[int, float]] = {}
+        self.recorder: Optional[MetricsRecorder] = None  # Opt-in per-day metrics
+        self.waste: Optional[WasteLedger] = None  # Opt-in wasted and idle capacity accounting
+        # What each queue position first affected, used to re-simulate only the days after an edit
+        self.first_funded: Dict[int, int] = {}  # Project uid -> first day it was given factories
+        self.spare_days: List[List[int]] = []  # [first, last] stretches with factories left after the whole queue
         self.law_manager = LawManager(trade_law, mobilization_law, economic_law, stability, war_support)
-        for state in self.states.values():
-            state.max_buildings["synthetic_refinery"] = rubber_factory_max
+        self.states.max_buildings[:, RULES.ids["synthetic_refinery"]] = rubber_factory_max
         self._update_factory_totals()
         self._update_modifiers()
 
+    def fork(self) -> "Game":
+        """Branch off a what-if copy of this game.
+
+        The state columns are shared between both games until one of them writes to a state,
+        so a fork costs its queue and a few small dicts. Pickling several forks together stores
+        shared columns once.
+        """
+        branch = Game.__new__(Game)
+        branch.__dict__.update(self.__dict__)
+        branch.states = self.states.fork()
+        branch.states.owner = branch
+        branch._industry_days = list(self._industry_days)
+        branch._construction_days = list(self._construction_days)
+        branch.modifiers = dict(self.modifiers)
+        branch._speed_cache = dict(self._speed_cache)
+        branch.law_manager = self.law_manager.fork()
+        branch.construction_queue = self.construction_queue.copy()
+        branch.recorder = self.recorder.copy() if self.recorder is not None else None
+        branch.waste = self.waste.copy() if self.waste is not None else None
+        branch.first_funded = dict(self.first_funded)
+        branch.spare_days = [list(stretch) for stretch in self.spare_days]
+        return branch
+
+    # Assigning new tech levels or unlock days invalidates the compiled modifier timeline
+    @property
+    def industry_level(self) -> int:
+        return self._industry_level
+
+    @industry_level.setter
+    def industry_level(self, level: int):
+        self._industry_level = level
+        self._timeline = None
+
+    @property
+    def construction_level(self) -> int:
+        return self._construction_level
+
+    @construction_level.setter
+    def construction_level(self, level: int):
+        self._construction_level = level
+        self._timeline = None
+
+    @property
+    def industry_days(self) -> List[int]:
+        return self._industry_days
+
+    @industry_days.setter
+    def industry_days(self, days: List[int]):
+        self._industry_days = days
+        self._timeline = None
+
+    @property
+    def construction_days(self) -> List[int]:
+        return self._construction_days
+
+    @construction_days.setter
+    def construction_days(self, days: List[int]):
+        self._construction_days = days
+        self._timeline = None
+
+    def _get_timeline(self) -> ModifierTimeline:
+        if self._timeline is None or self._timeline_version != self.law_manager.version:
+            self._timeline = compile_game_timeline(self)
+            self._timeline_version = self.law_manager.version
+            self._modifier_segment = None
+        return self._timeline
+
     def _update_modifiers(self):
-        self.law_manager.update_modifiers(self.current_day)
-        construction_modifier = 0.0
-        for i in range(1, self.construction_level + 1):
-            if self.construction_days[i-1] <= self.current_day:
-                construction_modifier += TECHNOLOGY_EFFECTS[f"construction{i}"]["construction_speed"]
+        timeline = self._get_timeline()
+        segment = timeline.segment(self.current_day)
+        if segment == self._modifier_segment:
+            return
+        self._modifier_segment = segment
+        self._speed_cache.clear()
+        values = timeline.values[segment]
+        self.law_manager.modifiers.update(
+            (k, v) for k, v in values.items() if not k.startswith("tech_")
+        )
         self.modifiers["construction_speed"] = (
-            self.law_manager.get_construction_speed_modifier("generic") + 
-            construction_modifier + 
+            self.law_manager.get_construction_speed_modifier(0) + 
+            values["tech_construction_speed"] + 
             self.modifiers.get("global", 0.0)
         )
 
     def get_construction_speed_modifier(self, state_id: int, building_type: str) -> float:
-        state = self.states.get(state_id)
-        if not state:
+        type_id = RULES.ids.get(building_type)
+        return self._speed_modifier(state_id, 0 if type_id is None else int(RULES.speed_class[type_id]))
+
+    def _project_speed_modifier(self, project: ConstructionProject) -> float:
+        return self._speed_modifier(project.state_id, int(RULES.speed_class[project.type_id]))
+
+    def _speed_modifier(self, state_id: int, speed_class: int) -> float:
+        states = self.states
+        row = states.rows.get(state_id)
+        if row is None:
             return 0.0
-        base_modifier = 1.0 + (state.infrastructure * INFRASTRUCTURE_SPEED_BONUS) + state.state_bonus
-        if state.has_dam:
-            base_modifier += 0.15
-        total_modifier = base_modifier + self.law_manager.get_construction_speed_modifier(building_type)
-        return max(0.0, total_modifier)
+        # Only civilian and military factories have their own law modifiers, everything else shares one entry
+        key = (state_id, speed_class)
+        cached = self._speed_cache.get(key)
+        version = states.speed_version[row]
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        total_modifier = float(states.base_speed[row]) + self.law_manager.get_construction_speed_modifier(speed_class)
+        modifier = max(0.0, total_modifier)
+        self._speed_cache[key] = (version, modifier)
+        return modifier
 
     def add_to_queue(self, state_id: int, building_type: str, quantity: int) -> bool:
-        if building_type not in BUILDING_TYPES:
-            return False
-        state = self.states.get(state_id)
-        if not state:
+        type_id = RULES.ids.get(building_type)
+        states = self.states
+        row = states.rows.get(state_id)
+        if type_id is None or row is None:
             return False
-        current_count = state.buildings.get(building_type, 0)
-        max_count = state.max_buildings.get(building_type, DEFAULT_MAX_BUILDINGS[building_type])
-        if current_count + quantity > max_count:
+        current_count = int(states.infrastructure[row] if type_id == INFRA else states.buildings[row, type_id])
+        if current_count + quantity > int(states.max_buildings[row, type_id]):
             return False
-        total_slots_needed = quantity if building_type in ["civilian_factory", "military_factory", "dockyard", "synthetic_refinery", "fuel_silo", "rocket_site", "nuclear_reactor"] else 0
-        if state.used_slots + total_slots_needed > state.total_slots:
+        total_slots_needed = quantity * int(RULES.occupies_slot[type_id])
+        if int(states.used_slots[row]) + total_slots_needed > int(states.total_slots[row]):
             return False
-        base_cost = BUILDING_COSTS.get(building_type, 0)
-        for _ in range(quantity):
-            project = ConstructionProject(
-                state_id=state_id,
-                building_type=building_type,
-                quantity=1,
-                cost=base_cost
-            )
-            self.construction_queue.append(project)
-        state.used_slots += total_slots_needed
+        project = ConstructionProject(state_id=state_id, type_id=type_id, quantity=quantity)
+        self.construction_queue.append(project)
+        row = states.writable_row(state_id)
+        states.used_slots[row] += total_slots_needed
         return True
 
     def simulate_days(self, days: int):
         if days <= 0:
             return
-        for _ in range(days):
-            self.current_day += 1
-            self._update_modifiers()
-            available_factories = self.available_civ_factories()
-            if not self.construction_queue:
-                continue
-            # Reset factory assignments
-            for project in self.construction_queue:
-                project.factories_assigned = 0
-            for project in self.construction_queue[:]:
-                if available_factories <= 0:
-                    break
-                factories = min(available_factories, MAX_FACTORIES_PER_PROJECT)
-                project.factories_assigned = factories
-                speed_modifier = self.get_construction_speed_modifier(project.state_id, project.building_type)
-                points_per_day = factories * CIVILIAN_FACTORY_OUTPUT * speed_modifier
-                project.progress += points_per_day
-                available_factories -= factories
-                if project.progress >= project.cost:
-                    state = self.states[project.state_id]
-                    state.buildings[project.building_type] = state.buildings.get(project.building_type, 0) + 1
-                    self.construction_queue.remove(project)
-                    state.used_slots -= 1 if project.building_type in ["civilian_factory", "military_factory", "dockyard", "synthetic_refinery", "fuel_silo", "rocket_site", "nuclear_reactor"] else 0
-                    available_factories += factories
-                    self._update_factory_totals()
-                    for next_project in self.construction_queue:
-                        if available_factories <= 0:
-                            break
-                        next_factories = min(available_factories, MAX_FACTORIES_PER_PROJECT)
-                        next_project.factories_assigned = next_factories
-                        available_factories -= next_factories
-            self._update_factory_totals()
+        self._advance(days)
+        self._update_consumer_goods()
+
+    def simulate_days_fast(self, days: int):
+        """Event-driven equivalent of simulate_days.
+
+        Stretches of days without a completion, law change or tech unlock are applied in bulk;
+        days on which something happens go through the same step as simulate_days.
+        """
+        if days <= 0:
+            return
+        self._advance_fast(days)
         self._update_consumer_goods()
 
+    def simulate_until(self, condition: Callable[["Game"], bool], max_days: int = 10000, fast: bool = True) -> Optional[int]:
+        """Simulate until `condition` holds at the end of a day, for at most `max_days` days.
+
+        Returns the day the condition was met, or None if it was not met in time. With fast=True,
+        plain callables are only checked after days on which something happened; see Condition.
+        """
+        reached = condition(self)
+        if not reached and max_days > 0:
+            reached = self._advance_fast(max_days, condition) if fast else self._advance(max_days, condition)
+            self._update_consumer_goods()
+        return self.current_day if reached else None
+
+    def _advance(self, days: int, condition: Optional[Callable[["Game"], bool]] = None) -> bool:
+        """Step through days without the end-of-run consumer goods update; True if stopped by `condition`."""
+        for _ in range(days):
+            self._simulate_day()
+            if condition is not None and condition(self):
+                return True
+        return False
+
+    def _advance_fast(self, days: int, condition: Optional[Callable[["Game"], bool]] = None) -> bool:
+        end_day = self.current_day + days
+        while self.current_day < end_day:
+            stop_day = end_day
+            if isinstance(condition, Condition):
+                deadline = condition.deadline(self)
+                if deadline is not None and deadline > self.current_day:
+                    stop_day = min(end_day, deadline)
+            self._step_fast(stop_day)
+            if condition is not None and condition(self):
+                return True
+        return False
+
+    def _step_fast(self, end_day: int):
+        """Simulate one event day or one stretch of quiet days, ending no later than `end_day`."""
+        day = self.current_day + 1
+        self.current_day = day
+        self._update_modifiers()
+        if not self.construction_queue:
+            next_change = self._next_scheduled_change(day)
+            last_quiet_day = min(end_day, next_change - 1) if next_change is not None else end_day
+            if self.available_civ_factories() > 0:
+                self._note_spare(last_quiet_day - day + 1)
+                self._note_idle(self.available_civ_factories(), last_quiet_day - day + 1)
+            if self.recorder is not None:
+                self.recorder.record(self, last_quiet_day - day + 1)
+            self.current_day = last_quiet_day
+            if self.current_day != day:
+                self._update_modifiers()
+            return
+        available_factories = self.available_civ_factories()
+        allocation = self._allocate_factories(available_factories)
+        first_completion = min(
+            (self._days_to_complete(project, points_per_day) for project, _, points_per_day in allocation),
+            default=math.inf
+        )
+        next_change = self._next_scheduled_change(day)
+        last_quiet_day = end_day if next_change is None else min(end_day, next_change - 1)
+        quiet_days = min(first_completion - 1, last_quiet_day - day + 1)
+        if quiet_days <= 0:
+            self.current_day = day - 1
+            self._simulate_day()
+            return
+        self.construction_queue.clear_assignments()
+        for project, factories, points_per_day in allocation:
+            self._assign(project, factories)
+            project.progress += points_per_day * quiet_days
+        idle = available_factories - sum(factories for _, factories, _ in allocation)
+        if idle > 0:
+            self._note_spare(quiet_days)
+            self._note_idle(idle, quiet_days)
+        if self.recorder is not None:
+            self.recorder.record(self, quiet_days)
+        self.current_day = day + quiet_days - 1
+
+    def _simulate_day(self):
+        self.current_day += 1
+        self._update_modifiers()
+        available_factories = self.available_civ_factories()
+        queue = self.construction_queue
+        if not queue:
+            if available_factories > 0:
+                self._note_spare()
+                self._note_idle(available_factories)
+            if self.recorder is not None:
+                self.recorder.record(self)
+            return
+        spare = False
+        queue.clear_assignments()
+        # Iterating the queue reads each successor before the project is handled, so completed
+        # entries can be unlinked on the spot
+        for project in queue:
+            if available_factories <= 0:
+                break
+            factories = min(available_factories, MAX_FACTORIES_PER_PROJECT)
+            self._assign(project, factories)
+            speed_modifier = self._project_speed_modifier(project)
+            points_per_day = factories * CIVILIAN_FACTORY_OUTPUT * speed_modifier
+            project.progress += points_per_day
+            available_factories -= factories
+            if project.progress >= project.cost:
+                if self.waste is not None:
+                    self.waste.overflow(self.current_day, project.state_id, project.building_type, project.progress - project.cost)
+                self._complete_building(project.state_id, project.type_id)
+                project.quantity -= 1
+                if project.quantity > 0:
+                    # The next unit of the entry starts from scratch with the same factories
+                    project.progress = 0.0
+                    continue
+                queue.remove(project)
+                available_factories += factories
+                for next_project in queue:
+                    if available_factories <= 0:
+                        break
+                    next_factories = min(available_factories, MAX_FACTORIES_PER_PROJECT)
+                    self._assign(next_project, next_factories)
+                    available_factories -= next_factories
+                else:
+                    spare = spare or available_factories > 0
+        else:
+            spare = spare or available_factories > 0
+            # Factories still unassigned after the whole queue stay idle for the day
+            self._note_idle(available_factories)
+        if spare:
+            self._note_spare()
+        if self.recorder is not None:
+            self.recorder.record(self)
+        if self.debug:
+            self._check_factory_totals()
+
+    def _assign(self, project: ConstructionProject, factories: int):
+        self.construction_queue.assign(project, factories)
+        if project.uid not in self.first_funded:
+            self.first_funded[project.uid] = self.current_day
+
+    def _note_spare(self, days: int = 1):
+        """Record that a project appended to the queue would have been given factories from today."""
+        if self.spare_days and self.spare_days[-1][1] == self.current_day - 1:
+            self.spare_days[-1][1] = self.current_day + days - 1
+        else:
+            self.spare_days.append([self.current_day, self.current_day + days - 1])
+
+    def _note_idle(self, factories: int, days: int = 1):
+        """Book idle factories in the waste ledger, as lost to the project cap while the queue is not empty."""
+        if self.waste is None or factories <= 0:
+            return
+        head = self.construction_queue.head
+        if head is None:
+            self.waste.idle(self.current_day, factories, days)
+        else:
+            speed_modifier = self._project_speed_modifier(head)
+            self.waste.idle(self.current_day, factories, days, head.state_id, head.building_type, factories * CIVILIAN_FACTORY_OUTPUT * speed_modifier)
+
+    def _allocate_factories(self, available_factories: int) -> List[Tuple[ConstructionProject, int, float]]:
+        """Factories and daily points each project receives on a day without completions."""
+        allocation = []
+        for project in self.construction_queue:
+            if available_factories <= 0:
+                break
+            factories = min(available_factories, MAX_FACTORIES_PER_PROJECT)
+            speed_modifier = self._project_speed_modifier(project)
+            allocation.append((project, factories, factories * CIVILIAN_FACTORY_OUTPUT * speed_modifier))
+            available_factories -= factories
+        return allocation
+
+    @staticmethod
+    def _days_to_complete(project: ConstructionProject, points_per_day: float) -> float:
+        if points_per_day <= 0:
+            return math.inf
+        remaining = project.cost - project.progress
+        days = max(1, math.ceil(remaining / points_per_day))
+        # Guard against the division rounding differently from repeated daily additions
+        if days > 1 and project.progress + (days - 1) * points_per_day >= project.cost:
+            days -= 1
+        elif project.progress + days * points_per_day < project.cost:
+            days += 1
+        return days
+
+    def _next_scheduled_change(self, day: int) -> Optional[int]:
+        """First day after `day` on which a law change, modifier change or tech unlock takes effect."""
+        return self._get_timeline().next_change(day)
+
     def _update_factory_totals(self):
-        self.total_civ_factories = sum(state.buildings.get("civilian_factory", 0) for state in self.states.values())
-        self.total_mil_factories = sum(state.buildings.get("military_factory", 0) for state in self.states.values())
-        self.total_dockyards = sum(state.buildings.get("dockyard", 0) for state in self.states.values())
+        """Recount the factory totals from every state; use after bulk edits to the states."""
+        self.total_civ_factories = self.states.total(CIV)
+        self.total_mil_factories = self.states.total(MIL)
+        self.total_dockyards = self.states.total(DOCK)
+
+    def _add_buildings(self, state_id: int, type_id: int, count: int):
+        row = self.states.writable_row(state_id)
+        self.states.buildings[row, type_id] += count
+        if type_id == CIV:
+            self.total_civ_factories += count
+        elif type_id == MIL:
+            self.total_mil_factories += count
+        elif type_id == DOCK:
+            self.total_dockyards += count
+
+    def _complete_building(self, state_id: int, type_id: int):
+        if type_id == INFRA:
+            # Raising the level changes the state's speed modifier, which invalidates its cached entries
+            state = self.states[state_id]
+            state.infrastructure = min(state.infrastructure + 1, state.max_buildings["infrastructure"])
+        else:
+            self._add_buildings(state_id, type_id, 1)
+        if RULES.occupies_slot[type_id]:
+            row = self.states.writable_row(state_id)
+            self.states.used_slots[row] -= 1
+
+    def _check_factory_totals(self):
+        expected = (self.total_civ_factories, self.total_mil_factories, self.total_dockyards)
+        self._update_factory_totals()
+        actual = (self.total_civ_factories, self.total_mil_factories, self.total_dockyards)
+        if expected != actual:
+            raise GameError(f"Factory totals out of sync on day {self.current_day}: tracked {expected}, recounted {actual}")
 
     def _update_consumer_goods(self):
         total_factories = self.total_civ_factories + self.total_mil_factories + self.total_dockyards
@@ -151,24 +436,23 @@ class Game:
         return max(0, int(self.total_civ_factories - consumer_goods + 0.999))
 
     def total_construction_points_per_day(self):
-        return sum(
-            project.factories_assigned * CIVILIAN_FACTORY_OUTPUT * self.get_construction_speed_modifier(project.state_id, project.building_type)
-            for project in self.construction_queue
-        )
+        total = 0.0
+        for project in self.construction_queue:
+            # Factories are always handed out from the top, so the first idle project ends the assigned ones
+            if project.factories_assigned == 0:
+                break
+            total += project.factories_assigned * CIVILIAN_FACTORY_OUTPUT * self._project_speed_modifier(project)
+        return total
 
     def consumer_goods_factories(self):
         return (self.total_civ_factories + self.total_mil_factories + self.total_dockyards) * self.consumer_goods_percent
 
     @property
     def military_production(self):
-        factory_output_modifier = self.law_manager.modifiers.get("factory_output", 0.0) + sum(
-            TECHNOLOGY_EFFECTS[f"industry{i}"]["factory_output"] for i in range(1, self.industry_level + 1) if self.industry_days[i-1] <= self.current_day
-        )
-        return sum(state.buildings.get("military_factory", 0) for state in self.states.values()) * (1.0 + factory_output_modifier)
+        factory_output_modifier = self.law_manager.modifiers.get("factory_output", 0.0) + self._get_timeline().at(self.current_day)["tech_factory_output"]
+        return self.total_mil_factories * (1.0 + factory_output_modifier)
 
     @property
     def naval_production(self):
-        factory_output_modifier = self.law_manager.modifiers.get("factory_output", 0.0) + sum(
-            TECHNOLOGY_EFFECTS[f"industry{i}"]["factory_output"] for i in range(1, self.industry_level + 1) if self.industry_days[i-1] <= self.current_day
-        )
-        return sum(state.buildings.get("dockyard", 0) for state in self.states.values()) * (1.0 + factory_output_modifier)
\ No newline at end of file
+        factory_output_modifier = self.law_manager.modifiers.get("factory_output", 0.0) + self._get_timeline().at(self.current_day)["tech_factory_output"]
+        return self.total_dockyards * (1.0 + factory_output_modifier)
\ No newline at end of file
@@ -0,0 +1,244 @@
+import json
+import logging
+import math
+import os
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from .game import Game
+from .laws import LawChange, ModifierChange
+from .batch import BatchSimulation
+from .checkpoints import CheckpointStore
+from .state import parse_state_file
+from .metrics import COLUMNS, MetricsRecorder
+from .waste import WasteLedger
+from .config import BUILDING_TYPES, TRADE_LAWS, ECONOMIC_LAWS
+
+# An engine advances a game in place by a number of days, like Game.simulate_days
+Engine = Callable[[Game, int], None]
+
+
+def _batch_run(game: Game, days: int):
+    batch = BatchSimulation([game])
+    batch.simulate_days(days)
+    batch.write_back()
+
+
+REFERENCE: Engine = Game.simulate_days
+CANDIDATES: Dict[str, Engine] = {
+    "event_driven": Game.simulate_days_fast,
+    "batch": _batch_run,
+    "checkpoints": lambda game, days: CheckpointStore(interval=7).run(game, days)
+}
+
+
+def _game(states: List[Dict], queue: List[tuple], **settings) -> Game:
+    game = Game(states=states, **settings)
+    for state_id, building_type, quantity in queue:
+        game.add_to_queue(state_id, building_type, quantity)
+    return game
+
+
+def parse_states_folder(folder: str, country_tag: str = "GER") -> List[Dict]:
+    """States of one country from a HOI4 history/states folder, read like the state loader does."""
+    states = []
+    for filename in sorted(os.listdir(folder)):
+        if filename.endswith(".txt"):
+            with open(os.path.join(folder, filename), "rb") as f:
+                states.extend(parse_state_file(f.read(), country_tag))
+    return states
+
+
+def golden_corpus(settings: Dict) -> Dict[str, Game]:
+    """Representative scenarios built from the states in the settings, the German set for the shipped settings.json."""
+    states = settings["states"]
+    by_slots = sorted(states, key=lambda s: s["total_slots"], reverse=True)
+    sid = by_slots[0]["id"]
+    mixed = [(s["id"], building_type, 2) for s in by_slots[:8] for building_type in ("infrastructure", "civilian_factory", "military_factory")]
+    corpus = {
+        "one_state": _game([by_slots[0]], [(sid, "infrastructure", 1), (sid, "civilian_factory", 3), (sid, "military_factory", 2)]),
+        "germany": _game(states, mixed),
+        "dams": _game([{**s, "has_dam": i % 3 == 0} for i, s in enumerate(states)], mixed),
+        "tech_unlocks": _game(
+            states, mixed, construction_level=5, construction_days=[0, 120, 365, 730, 1100],
+            industry_level=3, industry_days=[60, 400, 900, 0, 0]
+        )
+    }
+    laws = _game(states, mixed, economic_law="civilian_economy", trade_law="free_trade", stability=40.0, war_support=20.0)
+    laws.law_manager.law_changes = [
+        LawChange(150, "economic", "early_mobilization"),
+        LawChange(300, "trade", "export_focus"),
+        LawChange(450, "economic", "war_economy")
+    ]
+    laws.law_manager.modifier_changes = [ModifierChange(200, 0.1, "national spirit"), ModifierChange(500, -0.05, "national spirit ends")]
+    corpus["law_changes"] = laws
+    return corpus
+
+
+def random_scenario(settings: Dict, seed: int) -> Game:
+    """Random state subset, dams, queue, laws, law changes and tech unlocks."""
+    rng = random.Random(seed)
+    states = [{**s, "has_dam": rng.random() < 0.2} for s in rng.sample(settings["states"], rng.randint(1, len(settings["states"])))]
+    game = Game(
+        states=states,
+        construction_level=rng.randint(0, 5),
+        construction_days=sorted(rng.randint(0, 1500) for _ in range(5)),
+        industry_level=rng.randint(0, 5),
+        industry_days=sorted(rng.randint(0, 1500) for _ in range(5)),
+        trade_law=rng.choice(list(TRADE_LAWS)),
+        economic_law=rng.choice(list(ECONOMIC_LAWS)),
+        stability=rng.uniform(20, 90),
+        war_support=rng.uniform(0, 80)
+    )
+    ids = [s["id"] for s in states]
+    for _ in range(rng.randint(1, 60)):
+        game.add_to_queue(rng.choice(ids), rng.choice(BUILDING_TYPES), rng.randint(1, 3))
+    game.law_manager.law_changes = [
+        LawChange(rng.randint(1, 1000), law_type, rng.choice(list(laws)))
+        for law_type, laws in (("trade", TRADE_LAWS), ("economic", ECONOMIC_LAWS)) if rng.random() < 0.7
+    ]
+    return game
+
+
+def fingerprint(game: Game) -> Dict:
+    return {
+        "day": game.current_day,
+        "buildings": {sid: {bt: state.buildings.get(bt, 0) for bt in BUILDING_TYPES} for sid, state in game.states.items()},
+        "infrastructure": {sid: state.infrastructure for sid, state in game.states.items()},
+        "queue": [(p.uid, p.state_id, p.building_type, p.quantity) for p in game.construction_queue],
+        "progress": [p.progress for p in game.construction_queue],
+        "totals": (game.total_civ_factories, game.total_mil_factories, game.total_dockyards),
+        "consumer_goods_percent": game.consumer_goods_percent,
+        "first_funded": game.first_funded,
+        "spare_days": game.spare_days
+    }
+
+
+def _diff(reference: Dict, candidate: Dict, atol: float) -> List[str]:
+    differences = []
+    for key in ("day", "buildings", "infrastructure", "queue", "totals", "first_funded", "spare_days"):
+        if reference[key] != candidate[key]:
+            differences.append(f"{key}: {reference[key]} != {candidate[key]}")
+    if len(reference["progress"]) == len(candidate["progress"]):
+        for i, (a, b) in enumerate(zip(reference["progress"], candidate["progress"])):
+            if not math.isclose(a, b, rel_tol=0.0, abs_tol=atol):
+                differences.append(f"progress of queue entry {i}: {a} != {b}")
+    if not math.isclose(reference["consumer_goods_percent"], candidate["consumer_goods_percent"], abs_tol=1e-12):
+        differences.append(f"consumer_goods_percent: {reference['consumer_goods_percent']} != {candidate['consumer_goods_percent']}")
+    return differences
+
+
+def diff_engine(game: Game, engine: Engine, days: int, sample: int = 30, atol: float = 1e-6) -> List[str]:
+    """Run the reference loop and `engine` on forks of the game; empty if they agree.
+
+    The full state is compared every `sample` days, the recorded totals on every day the
+    candidate records them and the waste ledger totals at the end. Progress may differ by `atol` construction points, since bulk
+    stepping adds many days of progress at once.
+    """
+    reference = game.fork()
+    candidate = game.fork()
+    reference.recorder = MetricsRecorder()
+    candidate.recorder = MetricsRecorder()
+    reference.waste = WasteLedger()
+    candidate.waste = WasteLedger()
+    done = 0
+    while done < days:
+        step = min(sample, days - done)
+        REFERENCE(reference, step)
+        engine(candidate, step)
+        done += step
+        differences = _diff(fingerprint(reference), fingerprint(candidate), atol)
+        if differences:
+            return [f"day {reference.current_day}: {d}" for d in differences]
+    if len(candidate.recorder):
+        expected = reference.recorder.to_frame(daily=True)
+        actual = candidate.recorder.to_frame(daily=True)
+        if len(expected) != len(actual):
+            return [f"recorded {len(actual)} days instead of {len(expected)}"]
+        for column in COLUMNS:
+            mismatch = ~np.isclose(expected[column].to_numpy(float), actual[column].to_numpy(float), rtol=0.0, atol=atol)
+            if mismatch.any():
+                day = int(expected.index[np.argmax(mismatch)])
+                return [f"day {day}: {column}: {expected[column][day]} != {actual[column][day]}"]
+    for counter, expected in reference.waste.totals.items():
+        actual = candidate.waste.totals[counter]
+        if not math.isclose(expected, actual, rel_tol=1e-9, abs_tol=atol):
+            return [f"waste {counter}: {expected} != {actual}"]
+    return []
+
+
+def diff_lockstep(games: Dict[str, Game], days: int, sample: int = 30, atol: float = 1e-6) -> Dict[str, List[str]]:
+    """Run forks of all games together in one BatchSimulation and compare each with the reference loop.
+
+    The "batch" candidate packs one scenario at a time; this checks what only a shared batch
+    exercises: per-scenario queue indices, start days and law events, and write_back into
+    several games, which resumes the same batch every `sample` days.
+    """
+    names = list(games)
+    references = [games[name].fork() for name in names]
+    batch = BatchSimulation([games[name].fork() for name in names])
+    differences: Dict[str, List[str]] = {name: [] for name in names}
+    done = 0
+    while done < days:
+        step = min(sample, days - done)
+        batch.simulate_days(step)
+        batch.write_back()
+        done += step
+        for name, reference, candidate in zip(names, references, batch.games):
+            if not differences[name]:
+                REFERENCE(reference, step)
+                differences[name] = [f"day {reference.current_day}: {d}" for d in _diff(fingerprint(reference), fingerprint(candidate), atol)]
+    return differences
+
+
+def run_harness(
+    settings: Dict,
+    candidates: Optional[Dict[str, Engine]] = None,
+    days: int = 1500,
+    random_scenarios: int = 20,
+    seed: int = 0,
+    lockstep: bool = True
+) -> Dict[str, Dict[str, List[str]]]:
+    """Differences of every candidate engine from the reference on the corpus and random scenarios.
+
+    With lockstep all scenarios, plus one starting from a later day, also run in a single batch
+    and are reported as the "batch_lockstep" candidate.
+    """
+    candidates = candidates or CANDIDATES
+    scenarios = golden_corpus(settings)
+    for i in range(random_scenarios):
+        scenarios[f"random_{seed + i}"] = random_scenario(settings, seed + i)
+    report = {
+        name: {engine_name: diff_engine(game, engine, days) for engine_name, engine in candidates.items()}
+        for name, game in scenarios.items()
+    }
+    if lockstep:
+        staggered = scenarios["law_changes"].fork()
+        staggered.simulate_days(45)
+        scenarios["law_changes_day_45"] = staggered
+        report.setdefault("law_changes_day_45", {})
+        for name, differences in diff_lockstep(scenarios, days).items():
+            report[name]["batch_lockstep"] = differences
+    return report
+
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    # python -m src.golden [path to history/states] uses the German states parsed from the game files
+    with open("settings.json") as f:
+        settings = json.load(f)
+    if len(sys.argv) > 1:
+        settings["states"] = parse_states_folder(sys.argv[1])
+    start = time.perf_counter()
+    report = run_harness(settings)
+    failed = 0
+    for scenario, engines in report.items():
+        for engine, differences in engines.items():
+            print(f"{scenario:16s} {engine:14s} {'ok' if not differences else 'MISMATCH'}")
+            for difference in differences[:5]:
+                print(f"    {difference}")
+            failed += bool(differences)
+    print(f"{failed} mismatches in {time.perf_counter() - start:.1f} s")
+    sys.exit(1 if failed else 0)
@@ -1,14 +1,23 @@
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import List, Dict, Optional, Sequence, Tuple
 from .config import TRADE_LAWS, MOBILIZATION_LAWS, ECONOMIC_LAWS
+from .timeline import ModifierTimeline, compile_law_timeline
+from .rules import RULES
 
-@dataclass
+
+def construction_speed_modifiers(modifiers: Dict[str, float]) -> List[float]:
+    """Law construction speed modifier of each speed class in RULES, from LawManager.modifiers or a timeline segment."""
+    base = modifiers["construction_speed"]
+    return [max(0.0, base)] + [max(0.0, base + modifiers[f"{c}_speed"]) for c in RULES.speed_classes[1:]]
+
+
+@dataclass(frozen=True)
 class ModifierChange:
     day: int
     value: float
     description: str
 
-@dataclass
+@dataclass(frozen=True)
 class LawChange:
     day: int
     law_type: str
@@ -19,55 +28,87 @@ class LawManager:
         self.trade_law = trade_law if trade_law in TRADE_LAWS else "free_trade"
         self.mobilization_law = mobilization_law if mobilization_law in MOBILIZATION_LAWS else "volunteer_only"
         self.economic_law = economic_law if economic_law in ECONOMIC_LAWS else "civilian_economy"
-        self.stability = stability
-        self.war_support = war_support
         self.modifiers: Dict[str, float] = {
             "global": 0.0,
             "construction_speed": 0.0,
             "civilian_factory_speed": 0.0,
             "military_factory_speed": 0.0
         }
-        self.modifier_changes: List[ModifierChange] = []
-        self.law_changes: List[LawChange] = []
+        # Bumped on every schedule edit so compiled timelines know when to recompile
+        self.version = 0
+        self._timeline: Optional[ModifierTimeline] = None
+        self._timeline_version = -1
+        self.stability = stability
+        self.war_support = war_support
+        self.modifier_changes = ()
+        self.law_changes = ()
+
+    # The schedules are tuples of frozen changes, so every edit goes through a setter and bumps
+    # the version; assign a new sequence or use apply_law_change / apply_modifier_change
+    @property
+    def law_changes(self) -> Tuple[LawChange, ...]:
+        return self._law_changes
+
+    @law_changes.setter
+    def law_changes(self, changes: Sequence[LawChange]):
+        self._law_changes = tuple(changes)
+        self.version += 1
+
+    @property
+    def modifier_changes(self) -> Tuple[ModifierChange, ...]:
+        return self._modifier_changes
+
+    @modifier_changes.setter
+    def modifier_changes(self, changes: Sequence[ModifierChange]):
+        self._modifier_changes = tuple(changes)
+        self.version += 1
+
+    # Stability and war support enter the construction speed of every timeline segment
+    @property
+    def stability(self) -> float:
+        return self._stability
+
+    @stability.setter
+    def stability(self, value: float):
+        self._stability = value
+        self.version += 1
+
+    @property
+    def war_support(self) -> float:
+        return self._war_support
+
+    @war_support.setter
+    def war_support(self, value: float):
+        self._war_support = value
+        self.version += 1
+
+    def fork(self) -> "LawManager":
+        """Copy with its own modifiers; the schedules are immutable and the compiled timeline is shared until either side edits."""
+        branch = LawManager.__new__(LawManager)
+        branch.__dict__.update(self.__dict__)
+        branch.modifiers = dict(self.modifiers)
+        return branch
+
+    def timeline(self) -> ModifierTimeline:
+        """Scheduled law and modifier changes, recompiled only after the schedule was edited."""
+        if self._timeline is None or self._timeline_version != self.version:
+            self._timeline = compile_law_timeline(self)
+            self._timeline_version = self.version
+        return self._timeline
 
     def update_modifiers(self, day: int):
-        active_laws = {
-            "trade": self.trade_law,
-            "mobilization": self.mobilization_law,
-            "economic": self.economic_law
-        }
-        for change in sorted(self.law_changes, key=lambda x: x.day):
-            if change.day <= day:
-                if change.law_type == "trade" and change.new_law in TRADE_LAWS:
-                    active_laws["trade"] = change.new_law
-                elif change.law_type == "mobilization" and change.new_law in MOBILIZATION_LAWS:
-                    active_laws["mobilization"] = change.new_law
-                elif change.law_type == "economic" and change.new_law in ECONOMIC_LAWS:
-                    active_laws["economic"] = change.new_law
-        
-        self.modifiers["construction_speed"] = (
-            TRADE_LAWS[active_laws["trade"]]["construction_speed"] +
-            ECONOMIC_LAWS[active_laws["economic"]]["civilian_factory_speed"] +
-            (0.0 if self.stability >= 50 else (self.stability - 50) / 50 * -0.2) +
-            (self.war_support / 100 * 0.1)
-        )
-        self.modifiers["civilian_factory_speed"] = ECONOMIC_LAWS[active_laws["economic"]]["civilian_factory_speed"]
-        self.modifiers["military_factory_speed"] = ECONOMIC_LAWS[active_laws["economic"]]["military_factory_speed"]
-        self.modifiers["factory_output"] = TRADE_LAWS[active_laws["trade"]]["factory_output"]
-
-    def get_construction_speed_modifier(self, building_type: str) -> float:
-        base = self.modifiers["construction_speed"]
-        if building_type in ["civilian_factory", "military_factory"]:
-            base += self.modifiers[f"{building_type}_speed"]
-        return max(0.0, base)
+        self.modifiers.update(self.timeline().at(day))
+
+    def get_construction_speed_modifier(self, speed_class: int) -> float:
+        """Law modifier of a speed class of RULES; building types map to theirs in RULES.speed_class."""
+        return construction_speed_modifiers(self.modifiers)[speed_class]
 
     def apply_modifier_change(self, day: int, value: float, description: str):
-        self.modifier_changes.append(ModifierChange(day, value, description))
-        relevant_changes = [c for c in self.modifier_changes if c.day <= day]
-        self.modifiers["global"] = sum(c.value for c in relevant_changes)
+        self.modifier_changes = (*self.modifier_changes, ModifierChange(day, value, description))
+        self.modifiers["global"] = self.timeline().at(day)["global"]
 
     def apply_law_change(self, day: int, law_type: str, new_law: str):
-        self.law_changes.append(LawChange(day, law_type, new_law))
+        self.law_changes = (*self.law_changes, LawChange(day, law_type, new_law))
         if law_type == "trade" and new_law in TRADE_LAWS:
             self.trade_law = new_law
         elif law_type == "mobilization" and new_law in MOBILIZATION_LAWS:
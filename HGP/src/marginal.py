@@ -0,0 +1,82 @@
+import math
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+from .game import Game
+from .metrics import MetricsRecorder
+from .config import BUILDING_TYPES
+
+# Totals summed over the days up to the target day; military_output is military production per day summed
+VALUE_COLUMNS = ["civ_factory_days", "mil_factory_days", "military_output"]
+POSITIONS = ["front", "back"]
+
+
+def _values(game: Game, target_day: int) -> Dict[str, float]:
+    game.recorder = MetricsRecorder()
+    game.simulate_days_fast(target_day - game.current_day)
+    frame = game.recorder.to_frame(daily=True)
+    return {
+        "civ_factory_days": float(frame["total_civ_factories"].sum()),
+        "mil_factory_days": float(frame["total_mil_factories"].sum()),
+        "military_output": float(frame["military_production"].sum())
+    }
+
+
+def _perturb(baseline: Game, state_id: int, building_type: str, position: str) -> Optional[Game]:
+    """Fork of the baseline with one more unit queued, or None if the state has no room for it."""
+    branch = baseline.fork()
+    if not branch.add_to_queue(state_id, building_type, 1):
+        return None
+    if position == "front":
+        branch.construction_queue.move_to_front(branch.construction_queue.tail)
+    return branch
+
+
+def _run_candidates(baseline_blob: bytes, candidates: List[Tuple[int, str]], target_day: int, position: str) -> List[Dict]:
+    baseline = pickle.loads(baseline_blob)
+    results = []
+    for state_id, building_type in candidates:
+        branch = _perturb(baseline, state_id, building_type, position)
+        if branch is not None:
+            results.append({"state_id": state_id, "building_type": building_type, **_values(branch, target_day)})
+    return results
+
+
+def marginal_values(
+    game: Game,
+    target_day: int,
+    position: str = "front",
+    building_types: Optional[List[str]] = None,
+    max_workers: int = 1
+) -> pd.DataFrame:
+    """What one more unit of each building type in each state adds by `target_day`.
+
+    Every candidate is a fork of the game with one unit queued at the front or back of the
+    queue, simulated to the target day and compared with the unmodified game. Candidates the
+    state's free slots or max_buildings do not allow are left out. The game itself is not modified.
+    """
+    if position not in POSITIONS:
+        raise ValueError(f"Invalid queue position: {position}")
+    if target_day <= game.current_day:
+        raise ValueError(f"Target day {target_day} is not after the current day {game.current_day}")
+    building_types = building_types or BUILDING_TYPES
+    candidates = [(sid, bt) for sid in game.states for bt in building_types]
+    baseline = game.fork()
+    baseline.recorder = None
+    baseline.waste = None
+    base = _values(baseline.fork(), target_day)
+    blob = pickle.dumps(baseline, protocol=pickle.HIGHEST_PROTOCOL)
+    if max_workers <= 1:
+        results = _run_candidates(blob, candidates, target_day, position)
+    else:
+        chunk_size = max(1, math.ceil(len(candidates) / (max_workers * 4)))
+        chunks = [candidates[i:i + chunk_size] for i in range(0, len(candidates), chunk_size)]
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(chunks), os.cpu_count() or 1)) as executor:
+            futures = [executor.submit(_run_candidates, blob, chunk, target_day, position) for chunk in chunks]
+            results = [result for future in futures for result in future.result()]
+    frame = pd.DataFrame(results, columns=["state_id", "building_type", *VALUE_COLUMNS])
+    for column in VALUE_COLUMNS:
+        frame[column] -= base[column]
+    return frame.sort_values(["civ_factory_days", "military_output"], ascending=False, ignore_index=True)
@@ -0,0 +1,122 @@
+from bisect import bisect_right
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+
+COLUMNS = {
+    "total_civ_factories": np.int32,
+    "total_mil_factories": np.int32,
+    "total_dockyards": np.int32,
+    "available_civ_factories": np.int32,
+    "construction_points": np.float64,
+    "military_production": np.float64,
+    "queue_length": np.int32
+}
+
+
+class MetricsRecorder:
+    """Per-day economy metrics of a Game, stored column-wise in preallocated arrays.
+
+    A row is only appended when a value changes, so row i holds from days[i] until the next
+    row's day and daily and event-driven runs record the same rows. Each column keeps a
+    running maximum next to it, which makes "first day X reaches N" a binary search.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.length = 0
+        self.last_day: Optional[int] = None
+        self._last: Optional[tuple] = None
+        self._allocate(max(1, capacity))
+
+    def _allocate(self, capacity: int):
+        old_days = getattr(self, "days", None)
+        self.days = np.empty(capacity, dtype=np.int32)
+        columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in COLUMNS.items()}
+        running_max = {name: np.empty(capacity, dtype=dtype) for name, dtype in COLUMNS.items()}
+        if old_days is not None:
+            self.days[:self.length] = old_days[:self.length]
+            for name in COLUMNS:
+                columns[name][:self.length] = self.columns[name][:self.length]
+                running_max[name][:self.length] = self.running_max[name][:self.length]
+        self.columns = columns
+        self.running_max = running_max
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getstate__(self):
+        # Checkpoints and forks pickle the recorder with the game, so leave out the unused capacity
+        n = self.length
+        return {
+            "length": n, "last_day": self.last_day, "_last": self._last, "days": self.days[:n].copy(),
+            "columns": {name: column[:n].copy() for name, column in self.columns.items()},
+            "running_max": {name: column[:n].copy() for name, column in self.running_max.items()}
+        }
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._allocate(max(1, 2 * self.length))
+
+    def copy(self) -> "MetricsRecorder":
+        recorder = MetricsRecorder.__new__(MetricsRecorder)
+        recorder.__setstate__(self.__getstate__())
+        return recorder
+
+    def clear(self):
+        self.length = 0
+        self.last_day = None
+        self._last = None
+
+    def record(self, game, days: int = 1):
+        """Record the game's values for `days` days starting at game.current_day."""
+        values = (
+            game.total_civ_factories,
+            game.total_mil_factories,
+            game.total_dockyards,
+            game.available_civ_factories(),
+            game.total_construction_points_per_day(),
+            game.military_production,
+            len(game.construction_queue)
+        )
+        self.record_values(game.current_day, values, days)
+
+    def record_values(self, day: int, values: tuple, days: int = 1):
+        """Record values in COLUMNS order for `days` days starting at `day`."""
+        self.last_day = day + days - 1
+        if values == self._last:
+            return
+        if self.length == len(self.days):
+            self._allocate(2 * len(self.days))
+        i = self.length
+        self.days[i] = day
+        for name, value in zip(COLUMNS, values):
+            self.columns[name][i] = value
+            self.running_max[name][i] = max(value, self.running_max[name][i - 1]) if i else value
+        self.length += 1
+        self._last = values
+
+    def _row(self, day: int) -> Optional[int]:
+        if self.last_day is None or day > self.last_day:
+            return None
+        row = bisect_right(self.days[:self.length], day) - 1
+        return row if row >= 0 else None
+
+    def value(self, column: str, day: int) -> Optional[float]:
+        row = self._row(day)
+        return None if row is None else self.columns[column][row].item()
+
+    def at(self, day: int) -> Optional[Dict[str, float]]:
+        row = self._row(day)
+        return None if row is None else {name: column[row].item() for name, column in self.columns.items()}
+
+    def first_day_at_least(self, column: str, value: float) -> Optional[int]:
+        row = int(np.searchsorted(self.running_max[column][:self.length], value, side="left"))
+        return int(self.days[row]) if row < self.length else None
+
+    def to_frame(self, daily: bool = False) -> pd.DataFrame:
+        """Recorded rows indexed by day; daily=True repeats each row over the days it holds."""
+        n = self.length
+        frame = pd.DataFrame({name: column[:n] for name, column in self.columns.items()}, index=pd.Index(self.days[:n], name="day"))
+        if daily and n:
+            frame = frame.reindex(pd.RangeIndex(int(self.days[0]), self.last_day + 1, name="day"), method="ffill")
+        return frame
@@ -0,0 +1,117 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from .game import Game
+from .laws import LawChange
+from .metrics import MetricsRecorder
+from .sweep import apply_point
+
+METRICS = ["civilian_factories", "military_factories", "military_production"]
+# Recorder column of each metric
+COLUMNS = {"civilian_factories": "total_civ_factories", "military_factories": "total_mil_factories", "military_production": "military_production"}
+
+
+@dataclass
+class Uncertainty:
+    """Standard deviations (in days or stability points) of the sampled inputs."""
+    tech_day_sd: float = 30.0
+    law_day_sd: float = 30.0
+    stability_sd: float = 5.0
+
+
+@dataclass
+class MonteCarloResult:
+    days: int
+    runs: int
+    seed: int
+    percentiles: Tuple[int, ...]
+    bands: Dict[str, np.ndarray]  # metric -> (len(percentiles), days)
+    inputs: List[Dict[str, Any]] = field(default_factory=list)
+    start_day: int = 0  # Day of the game the runs continued from; band column i is day start_day + i + 1
+
+    def band(self, metric: str, percentile: int) -> np.ndarray:
+        return self.bands[metric][self.percentiles.index(percentile)]
+
+
+def _jitter(rng: np.random.Generator, day: int, sd: float, today: int) -> int:
+    # Days already simulated are history; later ones move but stay in the future
+    if day <= today:
+        return day
+    return max(today + 1, int(round(day + rng.normal(0.0, sd))))
+
+
+def sample_inputs(game: Game, uncertainty: Uncertainty, seed: int, run: int) -> Dict[str, Any]:
+    """Tech unlock days, scheduled law changes and stability of one run, jittered around the game's."""
+    # Each run has its own stream so results do not depend on how runs are split across workers
+    rng = np.random.default_rng([seed, run])
+    today = game.current_day
+    return {
+        "construction_days": [_jitter(rng, d, uncertainty.tech_day_sd, today) for d in game.construction_days],
+        "industry_days": [_jitter(rng, d, uncertainty.tech_day_sd, today) for d in game.industry_days],
+        "law_changes": [
+            {"day": _jitter(rng, c.day, uncertainty.law_day_sd, today), "law_type": c.law_type, "new_law": c.new_law}
+            for c in game.law_manager.law_changes
+        ],
+        "stability": float(np.clip(game.stability + rng.normal(0.0, uncertainty.stability_sd), 0.0, 100.0))
+    }
+
+
+def simulate_run(game: Game, inputs: Dict[str, Any], days: int) -> np.ndarray:
+    """Daily civilian factories, military factories and military production of one sampled run on a fork of the game."""
+    game = game.fork()
+    game.recorder = MetricsRecorder()
+    game.waste = None
+    game.construction_days = inputs["construction_days"]
+    game.industry_days = inputs["industry_days"]
+    game.law_manager.law_changes = [LawChange(c["day"], c["law_type"], c["new_law"]) for c in inputs["law_changes"]]
+    apply_point(game, {"stability": inputs["stability"]})
+    game.simulate_days_fast(days)
+    frame = game.recorder.to_frame(daily=True)
+    return np.stack([frame[COLUMNS[metric]].to_numpy(np.float32) for metric in METRICS])
+
+
+def _run_chunk(game, uncertainty, seed, runs, days):
+    inputs = [sample_inputs(game, uncertainty, seed, run) for run in runs]
+    return runs, inputs, np.stack([simulate_run(game, i, days) for i in inputs])
+
+
+def run_monte_carlo(
+    game: Game,
+    days: int,
+    runs: int,
+    seed: int = 0,
+    uncertainty: Optional[Uncertainty] = None,
+    percentiles: Tuple[int, ...] = (10, 50, 90),
+    max_workers: Optional[int] = None
+) -> MonteCarloResult:
+    """Percentile bands of `runs` continuations of the game as it stands, each with jittered inputs.
+
+    Every run forks the game, so it keeps its buildings, queue progress and day; only tech unlocks
+    and scheduled law changes still ahead of the current day are moved.
+    """
+    uncertainty = uncertainty or Uncertainty()
+    max_workers = max_workers or os.cpu_count() or 1
+    chunk_size = max(1, math.ceil(runs / max_workers))
+    chunks = [list(range(i, min(i + chunk_size, runs))) for i in range(0, runs, chunk_size)]
+    # The workers get the game without its metrics and waste history, which the runs do not use
+    game = game.fork()
+    game.recorder = game.waste = None
+    series = np.empty((runs, len(METRICS), days), dtype=np.float32)
+    inputs: List[Dict[str, Any]] = [{} for _ in range(runs)]
+    with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+        futures = [executor.submit(_run_chunk, game, uncertainty, seed, chunk, days) for chunk in chunks]
+        for future in futures:
+            chunk, chunk_inputs, chunk_series = future.result()
+            series[chunk] = chunk_series
+            for run, sampled in zip(chunk, chunk_inputs):
+                inputs[run] = sampled
+    bands = {
+        metric: np.percentile(series[:, m, :], percentiles, axis=0)
+        for m, metric in enumerate(METRICS)
+    }
+    return MonteCarloResult(
+        days=days, runs=runs, seed=seed, percentiles=tuple(percentiles), bands=bands, inputs=inputs, start_day=game.current_day
+    )
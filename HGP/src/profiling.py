@@ -0,0 +1,169 @@
+import functools
+import threading
+from collections import defaultdict
+from time import perf_counter
+from typing import Dict, List, Optional, Set, Tuple
+import pandas as pd
+from .game import Game
+from .batch import BatchSimulation
+
+# Methods timed while a PhaseTimer is enabled and the phase each one is reported as
+PHASES = [
+    (Game, "_advance", "run (daily)"),
+    (Game, "_advance_fast", "run (event-driven)"),
+    (Game, "_simulate_day", "day step"),
+    (Game, "_step_fast", "event step"),
+    (Game, "_update_modifiers", "modifiers"),
+    (Game, "_allocate_factories", "allocation"),
+    (Game, "_speed_modifier", "speed modifier"),
+    (Game, "_update_factory_totals", "factory totals"),
+    (Game, "_update_consumer_goods", "consumer goods"),
+    (BatchSimulation, "simulate_days", "batch run"),
+    (BatchSimulation, "_simulate_day", "batch day step"),
+    (BatchSimulation, "_refresh_law_speed", "batch law speed"),
+    (BatchSimulation, "_compact", "batch compaction")
+]
+# Phases whose calls advance the simulation, used for the cost per simulated day
+RUN_PHASES = {"run (daily)", "run (event-driven)", "batch run"}
+
+
+# The timer enabled on each thread and the time spent in nested phases of each of its open phases
+_local = threading.local()
+_patch_lock = threading.Lock()
+_enabled: Set["PhaseTimer"] = set()  # Timers enabled on any thread; the methods stay wrapped while there are some
+_originals: List[Tuple[type, str, object]] = []
+
+
+def _wrap(func, phase: str):
+    is_run = phase in RUN_PHASES
+
+    @functools.wraps(func)
+    def timed(obj, *args, **kwargs):
+        timer = getattr(_local, "timer", None)
+        if timer is None:
+            return func(obj, *args, **kwargs)
+        stack = _local.stack
+        if is_run:
+            before = obj.elapsed * len(obj.games) if isinstance(obj, BatchSimulation) else obj.current_day
+        stack.append(0.0)
+        start = perf_counter()
+        try:
+            return func(obj, *args, **kwargs)
+        finally:
+            elapsed = perf_counter() - start
+            nested = stack.pop()
+            timer.seconds[phase] += elapsed
+            timer.self_seconds[phase] += elapsed - nested
+            timer.calls[phase] += 1
+            if stack:
+                stack[-1] += elapsed
+            if is_run:
+                timer.days += (obj.elapsed * len(obj.games) if isinstance(obj, BatchSimulation) else obj.current_day) - before
+    return timed
+
+
+class PhaseTimer:
+    """Cumulative time and call counts per simulation phase.
+
+    While any timer is enabled the methods in PHASES are wrapped on their classes; disabling the
+    last one puts the originals back, so profiling costs nothing when no timer is on. Each wrapper
+    reports to the timer enabled on the calling thread, so Streamlit sessions profiling at once
+    only see their own runs. One timer can be enabled per thread. Self time leaves out the phases
+    called from within a phase; the self time of "day step" is the inline factory allocation and
+    progress of a daily step. Sweep workers are other processes and enable their own timers.
+
+        with PhaseTimer() as timer:
+            game.simulate_days(3650)
+        print(timer.to_frame())
+    """
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self.self_seconds: Dict[str, float] = defaultdict(float)
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.days = 0  # Days advanced by the run phases, summed over batch scenarios
+
+    @property
+    def enabled(self) -> bool:
+        return self in _enabled
+
+    def enable(self):
+        if getattr(_local, "timer", None) is not None:
+            raise RuntimeError("Another PhaseTimer is already enabled on this thread")
+        with _patch_lock:
+            if self in _enabled:
+                raise RuntimeError("This PhaseTimer is already enabled on another thread")
+            if not _enabled:
+                for cls, method, phase in PHASES:
+                    original = cls.__dict__[method]
+                    _originals.append((cls, method, original))
+                    setattr(cls, method, _wrap(original, phase))
+            _enabled.add(self)
+        _local.timer = self
+        _local.stack = []
+
+    def disable(self):
+        if getattr(_local, "timer", None) is not self:
+            return
+        _local.timer = _local.stack = None
+        with _patch_lock:
+            _enabled.discard(self)
+            if not _enabled:
+                for cls, method, original in reversed(_originals):
+                    setattr(cls, method, original)
+                _originals.clear()
+
+    def __enter__(self) -> "PhaseTimer":
+        self.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.disable()
+
+    def reset(self):
+        self.seconds.clear()
+        self.self_seconds.clear()
+        self.calls.clear()
+        self.days = 0
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.self_seconds.values())
+
+    @property
+    def seconds_per_day(self) -> Optional[float]:
+        run_seconds = sum(self.seconds[phase] for phase in RUN_PHASES if phase in self.seconds)
+        return run_seconds / self.days if self.days else None
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """Plain dict of the counters, small enough to return from a sweep worker."""
+        return {
+            phase: {"calls": self.calls[phase], "seconds": self.seconds[phase], "self_seconds": self.self_seconds[phase]}
+            for phase in self.calls
+        }
+
+    def merge(self, report: Dict[str, Dict[str, float]], days: int = 0):
+        """Add a report from another timer, e.g. one per sweep worker."""
+        for phase, counters in report.items():
+            self.calls[phase] += int(counters["calls"])
+            self.seconds[phase] += counters["seconds"]
+            self.self_seconds[phase] += counters["self_seconds"]
+        self.days += days
+
+    def to_frame(self) -> pd.DataFrame:
+        total = self.total_seconds
+        frame = pd.DataFrame(
+            [
+                {
+                    "phase": phase,
+                    "calls": self.calls[phase],
+                    "seconds": self.seconds[phase],
+                    "self_seconds": self.self_seconds[phase],
+                    "self_share": self.self_seconds[phase] / total if total else 0.0,
+                    "us_per_call": self.seconds[phase] / self.calls[phase] * 1e6
+                }
+                for phase in self.calls
+            ],
+            columns=["phase", "calls", "seconds", "self_seconds", "self_share", "us_per_call"]
+        )
+        return frame.sort_values("self_seconds", ascending=False).set_index("phase")
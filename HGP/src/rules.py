@@ -0,0 +1,41 @@
+from typing import Dict, List
+import numpy as np
+from .config import BUILDING_TYPES, BUILDING_COSTS, DEFAULT_MAX_BUILDINGS
+
+SLOT_BUILDINGS = ["civilian_factory", "military_factory", "dockyard", "synthetic_refinery", "fuel_silo", "rocket_site", "nuclear_reactor"]
+# Speed classes of the law construction speed modifiers; class 0 is the generic speed of every other building type
+SPEED_CLASSES = ["generic", "civilian_factory", "military_factory"]
+
+
+class BuildingRules:
+    """Building types numbered 0..n-1 in BUILDING_TYPES order, with their rules as arrays indexed by id.
+
+    The engine, the construction queue and the state table work with ids; names are looked up
+    at the edges, where buildings come from the UI, settings files or state files.
+    """
+
+    def __init__(self, names: List[str], costs: Dict[str, float], caps: Dict[str, int], slot_buildings: List[str], speed_classes: List[str]):
+        self.names = list(names)
+        self.ids: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.cost = np.array([float(costs.get(name, 0)) for name in self.names])
+        self.cap = np.array([caps[name] for name in self.names], dtype=np.int32)
+        self.occupies_slot = np.array([name in slot_buildings for name in self.names])
+        self.speed_class = np.array([speed_classes.index(name) if name in speed_classes else 0 for name in self.names], dtype=np.int8)
+        self.speed_classes = list(speed_classes)
+
+    def id(self, name: str) -> int:
+        """Id of a building type name; ValueError for unknown names."""
+        try:
+            return self.ids[name]
+        except KeyError:
+            raise ValueError(f"Invalid building type: {name}") from None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+RULES = BuildingRules(BUILDING_TYPES, BUILDING_COSTS, DEFAULT_MAX_BUILDINGS, SLOT_BUILDINGS, SPEED_CLASSES)
+INFRA = RULES.ids["infrastructure"]
+CIV = RULES.ids["civilian_factory"]
+MIL = RULES.ids["military_factory"]
+DOCK = RULES.ids["dockyard"]
@@ -0,0 +1,56 @@
+from collections import OrderedDict
+from typing import Dict
+import pandas as pd
+from .game import Game
+from .conditions import QueueEmpty
+from .checkpoints import scenario_key
+
+SCHEDULE_COLUMNS = ["uid", "position", "state_id", "building_type", "quantity", "start_day", "finish_day"]
+# Schedules of the most recently projected scenarios; a rerun with the same queue, laws and tech reuses them
+_cache: "OrderedDict[tuple, pd.DataFrame]" = OrderedDict()
+CACHE_SIZE = 16
+
+
+class _CompletionTracker(QueueEmpty):
+    """Stops at an empty queue and notes the day each entry left the queue."""
+
+    def __init__(self, game: Game):
+        self.remaining = {p.uid for p in game.construction_queue}
+        self.finished: Dict[int, int] = {}
+
+    def __call__(self, game) -> bool:
+        if len(game.construction_queue) < len(self.remaining):
+            queued = {p.uid for p in game.construction_queue}
+            for uid in self.remaining - queued:
+                self.finished[uid] = game.current_day
+            self.remaining = queued
+        return super().__call__(game)
+
+
+def project_schedule(game: Game, max_days: int = 10000) -> pd.DataFrame:
+    """Projected start and finish day of every queued entry, from an event-driven run of a fork.
+
+    start_day is the first day the entry gets factories and finish_day the day its last unit
+    completes; either is NaN if it lies more than `max_days` days ahead. Entries already under
+    way keep the day they first got factories.
+    """
+    key = (scenario_key(game), max_days)
+    if key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key].copy()
+    branch = game.fork()
+    branch.recorder = None
+    branch.waste = None
+    tracker = _CompletionTracker(branch)
+    branch.simulate_until(tracker, max_days)
+    schedule = pd.DataFrame(
+        [
+            (p.uid, i, p.state_id, p.building_type, p.quantity, branch.first_funded.get(p.uid), tracker.finished.get(p.uid))
+            for i, p in enumerate(game.construction_queue)
+        ],
+        columns=SCHEDULE_COLUMNS
+    ).astype({"start_day": float, "finish_day": float})
+    _cache[key] = schedule
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return schedule.copy()
@@ -1,7 +1,11 @@
+import copy
 import logging
 import re
-from typing import Dict, Optional, List
-from .config import BUILDING_TYPES, DEFAULT_MAX_BUILDINGS, STATE_CATEGORIES
+from collections.abc import Mapping, MutableMapping
+from typing import Callable, Dict, Iterable, Iterator, Optional, List
+import numpy as np
+from .config import BUILDING_TYPES, DEFAULT_MAX_BUILDINGS, STATE_CATEGORIES, INFRASTRUCTURE_SPEED_BONUS
+from .rules import RULES
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
@@ -9,7 +13,206 @@ logger = logging.getLogger(__name__)
 class StateError(Exception):
     pass
 
+# Hot columns copied together on the first write after a fork
+HOT_COLUMNS = ["buildings", "max_buildings", "total_slots", "used_slots", "infrastructure", "state_bonus", "has_dam", "base_speed"]
+COLD_FIELDS = ["name", "category", "owner", "provinces", "history", "manpower", "province_buildings"]
+
+
+def base_speed_modifiers(infrastructure: np.ndarray, state_bonus: np.ndarray, has_dam: np.ndarray) -> np.ndarray:
+    """Construction speed modifier of states before laws and tech.
+
+    The only implementation of the formula; the engines read it from StateTable.base_speed or
+    apply it to their own columns, so their floats match exactly.
+    """
+    speed = 1.0 + (infrastructure * INFRASTRUCTURE_SPEED_BONUS) + state_bonus
+    return np.where(has_dam, speed + 0.15, speed)
+
+
+class StateTable(Mapping):
+    """The states of a game, by id, with the fields the simulation reads held in NumPy columns.
+
+    Row k of every column belongs to ids[k]. Names, provinces, history and the other fields the
+    simulation never reads are kept per row in `cold` as given; defaults for missing ones are
+    filled in when first read. Indexing the table returns a State view of a row.
+
+    A forked table shares its columns with the original until either of them writes to a state;
+    the writer then copies all columns, which for a few thousand states is a few hundred KB.
+    """
+
+    def __init__(self, states: Iterable[Dict]):
+        records = list(states)
+        n = len(records)
+        self.ids: List[int] = [record["id"] for record in records]
+        self.rows: Dict[int, int] = {sid: k for k, sid in enumerate(self.ids)}
+        self.buildings = np.zeros((n, len(RULES)), dtype=np.int32)
+        self.max_buildings = np.tile(RULES.cap, (n, 1))
+        self.total_slots = np.zeros(n, dtype=np.int32)
+        self.used_slots = np.zeros(n, dtype=np.int32)
+        self.infrastructure = np.zeros(n, dtype=np.int32)
+        self.state_bonus = np.zeros(n)
+        self.has_dam = np.zeros(n, dtype=bool)
+        self.speed_version: List[int] = [0] * n  # Bumped when a field of the speed modifier changes
+        self.cold: List[Dict] = []
+        for k, record in enumerate(records):
+            category = record["category"] if record["category"] in STATE_CATEGORIES else "rural"
+            buildings = record["buildings"]
+            self.buildings[k] = [min(max(0, buildings.get(bt, 0)), cap) for bt, cap in zip(RULES.names, RULES.cap.tolist())]
+            for bt, cap in (record.get("max_buildings") or {}).items():
+                if bt in RULES.ids:
+                    self.max_buildings[k, RULES.ids[bt]] = cap
+            self.total_slots[k] = STATE_CATEGORIES[category].slots
+            self.infrastructure[k] = min(max(0, record["infrastructure"]), DEFAULT_MAX_BUILDINGS["infrastructure"])
+            self.state_bonus[k] = min(max(0.0, float(record.get("state_bonus", 0.0))), 1.0)
+            self.has_dam[k] = record.get("has_dam", False)
+            if self.has_dam[k]:
+                self.total_slots[k] = int(self.total_slots[k] * 1.15)
+                logger.info(f"Initialized state {record['name'][:50]} (ID {record['id']}) with dam: +15% total_slots")
+            self.cold.append({**{field: record.get(field) for field in COLD_FIELDS}, "category": category})
+        self.used_slots[:] = self.buildings[:, RULES.occupies_slot].sum(axis=1)
+        self.base_speed = base_speed_modifiers(self.infrastructure, self.state_bonus, self.has_dam)
+        self._views: Dict[int, State] = {}
+        self._shared = False
+        self.owner = None  # Game whose factory totals follow writes to the building counts
+
+    def _buildings_written(self):
+        if self.owner is not None:
+            self.owner._update_factory_totals()
+
+    def fork(self) -> "StateTable":
+        """Copy for a Game fork; the columns stay shared until the first write on either side."""
+        table = copy.copy(self)
+        table._views = {}
+        self._shared = table._shared = True
+        return table
+
+    def _write(self):
+        if self._shared:
+            for column in HOT_COLUMNS:
+                setattr(self, column, getattr(self, column).copy())
+            self.speed_version = list(self.speed_version)
+            self.cold = list(self.cold)
+            self._shared = False
+
+    def writable_row(self, state_id: int) -> int:
+        """Row of a state, for writing to the columns directly; copies them first if a fork shares them.
+
+        Call it before reading the column attribute, which the copy replaces.
+        """
+        self._write()
+        return self.rows[state_id]
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_views"] = {}
+        return state
+
+    def __getitem__(self, state_id: int) -> "State":
+        view = self._views.get(state_id)
+        if view is None:
+            view = State._view(self, self.rows[state_id])
+            self._views[state_id] = view
+        return view
+
+    def get(self, state_id: int, default=None):
+        return self[state_id] if state_id in self.rows else default
+
+    def __contains__(self, state_id) -> bool:
+        return state_id in self.rows
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def total(self, type_id: int) -> int:
+        return int(self.buildings[:, type_id].sum())
+
+    def _speed_written(self, row: int):
+        self.speed_version[row] += 1
+        rows = slice(row, row + 1)
+        self.base_speed[rows] = base_speed_modifiers(self.infrastructure[rows], self.state_bonus[rows], self.has_dam[rows])
+
+    def key(self) -> tuple:
+        """Hashable snapshot of the hot columns; used slots and base speed follow from the others."""
+        return (tuple(self.ids),) + tuple(getattr(self, column).tobytes() for column in HOT_COLUMNS if column not in ("used_slots", "base_speed"))
+
+
+class BuildingCounts(MutableMapping):
+    """Dict-like view of one row of a building column of a StateTable."""
+    __slots__ = ("_table", "_row", "_column")
+
+    def __init__(self, table: StateTable, row: int, column: str):
+        self._table = table
+        self._row = row
+        self._column = column
+
+    def __getitem__(self, building_type: str) -> int:
+        return int(getattr(self._table, self._column)[self._row, RULES.ids[building_type]])
+
+    def get(self, building_type: str, default=None):
+        type_id = RULES.ids.get(building_type)
+        return default if type_id is None else int(getattr(self._table, self._column)[self._row, type_id])
+
+    def __setitem__(self, building_type: str, count: int):
+        self._table._write()
+        getattr(self._table, self._column)[self._row, RULES.ids[building_type]] = count
+        if self._column == "buildings":
+            self._table._buildings_written()
+
+    def __delitem__(self, building_type: str):
+        raise TypeError("Building types cannot be removed from a state")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(RULES.names)
+
+    def __len__(self) -> int:
+        return len(RULES)
+
+    def copy(self) -> Dict[str, int]:
+        return dict(zip(RULES.names, getattr(self._table, self._column)[self._row].tolist()))
+
+    def __repr__(self):
+        return repr(self.copy())
+
+
+def _hot(column: str, cast: type, speed: bool = False) -> property:
+    def getter(self):
+        return cast(getattr(self._table, column)[self._row])
+
+    def setter(self, value):
+        self._table._write()
+        getattr(self._table, column)[self._row] = value
+        if speed:
+            self._table._speed_written(self._row)
+
+    return property(getter, setter)
+
+
+def _cold(field: str, default: Callable) -> property:
+    def getter(self):
+        record = self._table.cold[self._row]
+        value = record.get(field)
+        if value is None:
+            # Stored so the state keeps returning the same object
+            value = record[field] = default()
+        return value
+
+    def setter(self, value):
+        self._table._write()
+        self._table.cold[self._row] = {**self._table.cold[self._row], field: value}
+
+    return property(getter, setter)
+
+
 class State:
+    """One row of a StateTable.
+
+    Constructed directly, a State gets a table of its own; the states of a game are views of
+    the game's table, so writing to them writes to the table.
+    """
+    __slots__ = ("_table", "_row")
+
     def __init__(
         self,
         id: int,
@@ -27,28 +230,79 @@ class State:
         province_buildings: Optional[Dict[str, Dict]] = None,
         has_dam: bool = False
     ):
-        self.id = id
-        self.name = name[:50]
-        self.category = category if category in STATE_CATEGORIES else "rural"
-        self.total_slots = STATE_CATEGORIES[self.category].slots
-        self.infrastructure = min(max(0, infrastructure), DEFAULT_MAX_BUILDINGS["infrastructure"])
-        self.buildings = {
-            bt: min(max(0, buildings.get(bt, 0)), DEFAULT_MAX_BUILDINGS[bt])
-            for bt in BUILDING_TYPES
+        record = {
+            "id": id, "name": name, "category": category, "total_slots": total_slots, "infrastructure": infrastructure,
+            "buildings": buildings, "owner": owner, "state_bonus": state_bonus, "max_buildings": max_buildings,
+            "provinces": provinces, "history": history, "manpower": manpower, "province_buildings": province_buildings,
+            "has_dam": has_dam
         }
-        self.owner = owner
-        self.state_bonus = min(max(0.0, float(state_bonus)), 1.0)
-        self.max_buildings = max_buildings or DEFAULT_MAX_BUILDINGS.copy()
-        self.provinces = provinces or []
-        self.history = history or {"victory_points": [], "cores": []}
-        self.manpower = max(0, manpower)
-        self.province_buildings = province_buildings or {}
-        self.has_dam = has_dam
-        self.used_slots = sum(self.buildings.get(bt, 0) for bt in BUILDING_TYPES 
-                             if bt in ["civilian_factory", "military_factory", "dockyard", "synthetic_refinery", "fuel_silo", "rocket_site", "nuclear_reactor"])
-        if self.has_dam:
-            self.total_slots = int(self.total_slots * 1.15)
-            logger.info(f"Initialized state {self.name} (ID {self.id}) with dam: +15% total_slots")
+        self._table = StateTable([record])
+        self._row = 0
+
+    @classmethod
+    def _view(cls, table: StateTable, row: int) -> "State":
+        state = cls.__new__(cls)
+        state._table = table
+        state._row = row
+        return state
+
+    @property
+    def id(self) -> int:
+        return self._table.ids[self._row]
+
+    @property
+    def name(self) -> str:
+        return self._table.cold[self._row]["name"][:50]
+
+    @name.setter
+    def name(self, value: str):
+        self._table._write()
+        self._table.cold[self._row] = {**self._table.cold[self._row], "name": value[:50]}
+
+    category = _cold("category", lambda: "rural")
+    owner = _cold("owner", str)
+    provinces = _cold("provinces", list)
+    history = _cold("history", lambda: {"victory_points": [], "cores": []})
+    province_buildings = _cold("province_buildings", dict)
+
+    @property
+    def manpower(self) -> int:
+        return max(0, self._table.cold[self._row].get("manpower") or 0)
+
+    @manpower.setter
+    def manpower(self, value: int):
+        self._table._write()
+        self._table.cold[self._row] = {**self._table.cold[self._row], "manpower": value}
+
+    total_slots = _hot("total_slots", int)
+    used_slots = _hot("used_slots", int)
+    # Fields feeding the construction speed modifier bump speed_version so cached modifiers can be revalidated
+    infrastructure = _hot("infrastructure", int, speed=True)
+    state_bonus = _hot("state_bonus", float, speed=True)
+    has_dam = _hot("has_dam", bool, speed=True)
+
+    @property
+    def speed_version(self) -> int:
+        return self._table.speed_version[self._row]
+
+    @property
+    def buildings(self) -> BuildingCounts:
+        return BuildingCounts(self._table, self._row, "buildings")
+
+    @buildings.setter
+    def buildings(self, counts: Dict[str, int]):
+        self._table._write()
+        self._table.buildings[self._row] = [counts.get(bt, 0) for bt in RULES.names]
+        self._table._buildings_written()
+
+    @property
+    def max_buildings(self) -> BuildingCounts:
+        return BuildingCounts(self._table, self._row, "max_buildings")
+
+    @max_buildings.setter
+    def max_buildings(self, caps: Dict[str, int]):
+        self._table._write()
+        self._table.max_buildings[self._row] = [caps.get(bt, cap) for bt, cap in zip(RULES.names, RULES.cap.tolist())]
 
 
 def parse_state_file(file_content: bytes, country_tag: str = None) -> List[Dict]:
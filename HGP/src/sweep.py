@@ -0,0 +1,174 @@
+import itertools
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Union
+from .game import Game
+from .construction import ConstructionProject
+from .rules import RULES
+from .conditions import Condition
+from .profiling import PhaseTimer
+from .cache import ResultCache, simulate_cached
+
+GAME_PARAMS = [
+    "industry_level",
+    "construction_level",
+    "industry_days",
+    "construction_days",
+    "trade_law",
+    "mobilization_law",
+    "economic_law",
+    "rubber_factory_max",
+    "consumer_goods_percent",
+    "stability",
+    "war_support"
+]
+
+# One result cache per directory and worker process, so its in-memory LRU outlives a chunk
+_caches: Dict[str, ResultCache] = {}
+
+SWEEP_PARAMS = ["trade_law", "economic_law", "construction_days", "industry_days", "stability", "war_support"]
+
+
+def queue_to_dicts(queue: List[ConstructionProject]) -> List[Dict[str, Any]]:
+    return [
+        {"state_id": p.state_id, "building_type": p.building_type, "quantity": p.quantity, "progress": p.progress}
+        for p in queue
+    ]
+
+
+def build_game(settings: Dict[str, Any], queue: Optional[List[Dict[str, Any]]] = None, **overrides) -> Game:
+    """Create a fresh Game from session settings, a serialized queue and per-run overrides."""
+    game_settings = {k: v for k, v in settings.items() if k in GAME_PARAMS}
+    game_settings.update(overrides)
+    game = Game(states=settings["states"], **game_settings)
+    for item in queue or []:
+        project = ConstructionProject(
+            state_id=item["state_id"],
+            type_id=RULES.id(item["building_type"]),
+            quantity=item["quantity"],
+            progress=item.get("progress", 0.0)
+        )
+        game.construction_queue.append(project)
+        state = game.states.get(project.state_id)
+        if state and RULES.occupies_slot[project.type_id]:
+            state.used_slots += project.quantity
+    return game
+
+
+def summarize(game: Game) -> Dict[str, Any]:
+    return {
+        "day": game.current_day,
+        "civilian_factories": game.total_civ_factories,
+        "military_factories": game.total_mil_factories,
+        "dockyards": game.total_dockyards,
+        "military_production": game.military_production,
+        "queue_length": len(game.construction_queue)
+    }
+
+
+def _tech_days(base: List[int], value: Union[int, List[int]]) -> List[int]:
+    # An int is a delay applied to every configured unlock day, a list replaces them
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [max(0, d + value) for d in base]
+
+
+def sweep_grid(ranges: Dict[str, List]) -> List[Dict[str, Any]]:
+    unknown = set(ranges) - set(SWEEP_PARAMS)
+    if unknown:
+        raise ValueError(f"Cannot sweep over {sorted(unknown)}")
+    names = [name for name in SWEEP_PARAMS if ranges.get(name)]
+    return [dict(zip(names, values)) for values in itertools.product(*(ranges[name] for name in names))]
+
+
+def apply_point(game: Game, point: Dict[str, Any]):
+    """Apply the swept parameters of a point to a game from its current day on, like the law and tech settings do."""
+    laws = game.law_manager
+    for name, value in point.items():
+        if name in ("trade_law", "economic_law"):
+            laws.apply_law_change(game.current_day, name.split("_")[0], value)
+            setattr(game, name, value)
+        elif name in ("stability", "war_support"):
+            setattr(game, name, value)
+            setattr(laws, name, value)
+        elif name in ("construction_days", "industry_days"):
+            setattr(game, name, _tech_days(getattr(game, name), value))
+        else:
+            raise ValueError(f"Cannot sweep over {name}")
+
+
+def run_point(
+    game: Game,
+    point: Dict[str, Any],
+    days: int,
+    until: Optional[Condition] = None,
+    profile: bool = False,
+    cache_dir: Optional[str] = None
+) -> Dict[str, Any]:
+    """Simulate one sweep point on a fork of the game, from the game's current day.
+
+    With profile=True the result carries a PhaseTimer report under "profile". With a cache_dir
+    fixed-length runs go through the result cache there and report whether they were "cached",
+    and the change in the cache's stats under "cache_stats".
+    """
+    if profile:
+        with PhaseTimer() as timer:
+            result = run_point(game, point, days, until, cache_dir=cache_dir)
+        result["profile"] = timer.report()
+        result["profile_days"] = timer.days
+        return result
+    start = time.perf_counter()
+    game = game.fork()
+    game.recorder = game.waste = None
+    apply_point(game, point)
+    if until is None and cache_dir is not None:
+        cache = _caches.setdefault(cache_dir, ResultCache(cache_dir))
+        before = dict(cache.stats)
+        game = simulate_cached(game, days, cache)
+        stats = {name: cache.stats[name] - before[name] for name in before}
+        result = {**point, **summarize(game), "cached": stats["misses"] == 0, "cache_stats": stats}
+    elif until is None:
+        game.simulate_days_fast(days)
+        result = {**point, **summarize(game)}
+    else:
+        # days caps the run; runs that never meet the condition report reached_day None
+        result = {**point, "reached_day": game.simulate_until(until, days), **summarize(game)}
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def _run_chunk(game, points, days, until, profile, cache_dir) -> List[Dict[str, Any]]:
+    return [run_point(game, point, days, until, profile, cache_dir) for point in points]
+
+
+def run_sweep(
+    game: Game,
+    ranges: Dict[str, List],
+    days: int,
+    max_workers: Optional[int] = None,
+    until: Optional[Condition] = None,
+    profile: bool = False,
+    cache_dir: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """Simulate every point of the cartesian grid on forks of the game in a process pool, yielding results as they finish.
+
+    Every point continues the game as it stands: its states, queue progress, day and scheduled
+    law and modifier changes, with the point's parameters applied from the current day on.
+
+    With profile=True each result has the worker's phase timings; PhaseTimer.merge adds them up.
+    With a cache_dir the workers share a ResultCache there and each result says if it was "cached",
+    with the lookup's counts of ResultCache.stats under "cache_stats".
+    """
+    points = sweep_grid(ranges)
+    if not points:
+        return
+    max_workers = max_workers or os.cpu_count() or 1
+    # A few chunks per worker keeps the pool busy without pickling the game once per point
+    chunk_size = max(1, math.ceil(len(points) / (max_workers * 4)))
+    chunks = [points[i:i + chunk_size] for i in range(0, len(points), chunk_size)]
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        futures = [executor.submit(_run_chunk, game, chunk, days, until, profile, cache_dir) for chunk in chunks]
+        for future in as_completed(futures):
+            yield from future.result()
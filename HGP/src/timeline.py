@@ -0,0 +1,97 @@
+from bisect import bisect_right
+from typing import Dict, List, Optional
+from .config import TRADE_LAWS, MOBILIZATION_LAWS, ECONOMIC_LAWS, TECHNOLOGY_EFFECTS
+
+
+class ModifierTimeline:
+    """Piecewise-constant modifiers: values[i] holds from days[i] until the next breakpoint.
+
+    values[0] applies before the first scheduled change, so days[0] is always None.
+    """
+
+    def __init__(self, days: List[Optional[int]], values: List[Dict[str, float]]):
+        self.days = days
+        self.values = values
+        self._breakpoints = days[1:]
+
+    def segment(self, day: int) -> int:
+        return bisect_right(self._breakpoints, day)
+
+    def at(self, day: int) -> Dict[str, float]:
+        return self.values[self.segment(day)]
+
+    def next_change(self, day: int) -> Optional[int]:
+        index = bisect_right(self._breakpoints, day)
+        return self._breakpoints[index] if index < len(self._breakpoints) else None
+
+
+def law_modifiers(law_manager, trade_law: str, economic_law: str) -> Dict[str, float]:
+    return {
+        "construction_speed": (
+            TRADE_LAWS[trade_law]["construction_speed"] +
+            ECONOMIC_LAWS[economic_law]["civilian_factory_speed"] +
+            (0.0 if law_manager.stability >= 50 else (law_manager.stability - 50) / 50 * -0.2) +
+            (law_manager.war_support / 100 * 0.1)
+        ),
+        "civilian_factory_speed": ECONOMIC_LAWS[economic_law]["civilian_factory_speed"],
+        "military_factory_speed": ECONOMIC_LAWS[economic_law]["military_factory_speed"],
+        "factory_output": TRADE_LAWS[trade_law]["factory_output"]
+    }
+
+
+def compile_law_timeline(law_manager) -> ModifierTimeline:
+    """Compile LawManager.law_changes and modifier_changes into a timeline."""
+    active_laws = {
+        "trade": law_manager.trade_law,
+        "mobilization": law_manager.mobilization_law,
+        "economic": law_manager.economic_law
+    }
+    law_changes = sorted(law_manager.law_changes, key=lambda x: x.day)
+    modifier_changes = sorted(law_manager.modifier_changes, key=lambda x: x.day)
+    change_days = sorted({c.day for c in law_changes} | {c.day for c in modifier_changes})
+
+    days: List[Optional[int]] = [None]
+    values = [{**law_modifiers(law_manager, active_laws["trade"], active_laws["economic"]), "global": 0.0}]
+    law_index = modifier_index = 0
+    global_modifier = 0.0
+    for day in change_days:
+        while law_index < len(law_changes) and law_changes[law_index].day <= day:
+            change = law_changes[law_index]
+            if change.law_type == "trade" and change.new_law in TRADE_LAWS:
+                active_laws["trade"] = change.new_law
+            elif change.law_type == "mobilization" and change.new_law in MOBILIZATION_LAWS:
+                active_laws["mobilization"] = change.new_law
+            elif change.law_type == "economic" and change.new_law in ECONOMIC_LAWS:
+                active_laws["economic"] = change.new_law
+            law_index += 1
+        while modifier_index < len(modifier_changes) and modifier_changes[modifier_index].day <= day:
+            global_modifier += modifier_changes[modifier_index].value
+            modifier_index += 1
+        days.append(day)
+        values.append({**law_modifiers(law_manager, active_laws["trade"], active_laws["economic"]), "global": global_modifier})
+    return ModifierTimeline(days, values)
+
+
+def compile_game_timeline(game) -> ModifierTimeline:
+    """Law timeline of the game's LawManager extended with construction and industry tech unlocks."""
+    laws = compile_law_timeline(game.law_manager)
+    construction_days = [game.construction_days[i - 1] for i in range(1, game.construction_level + 1)]
+    industry_days = [game.industry_days[i - 1] for i in range(1, game.industry_level + 1)]
+    breakpoints = sorted(set(laws.days[1:]) | set(construction_days) | set(industry_days))
+
+    days: List[Optional[int]] = [None]
+    values = []
+    for day in [None] + breakpoints:
+        # None stands for any day before the first breakpoint, where only day-0-or-earlier unlocks can apply
+        reference = day if day is not None else (breakpoints[0] - 1 if breakpoints else 0)
+        construction_modifier = 0.0
+        for i in range(1, game.construction_level + 1):
+            if game.construction_days[i - 1] <= reference:
+                construction_modifier += TECHNOLOGY_EFFECTS[f"construction{i}"]["construction_speed"]
+        factory_output = sum(
+            TECHNOLOGY_EFFECTS[f"industry{i}"]["factory_output"] for i in range(1, game.industry_level + 1) if game.industry_days[i - 1] <= reference
+        )
+        if day is not None:
+            days.append(day)
+        values.append({**laws.at(reference), "tech_construction_speed": construction_modifier, "tech_factory_output": factory_output})
+    return ModifierTimeline(days, values)
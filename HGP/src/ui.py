@@ -2,11 +2,26 @@ import streamlit as st
 import os
 import json
 import pandas as pd
+import altair as alt
 import math
+from contextlib import nullcontext
 from typing import List, Dict, Any
 from .state import State, parse_state_file
 from .game import Game, GameError
 from .laws import ModifierChange, LawChange, LawManager
+from .sweep import run_sweep, summarize, sweep_grid
+from .montecarlo import METRICS, Uncertainty, run_monte_carlo
+from .checkpoints import CheckpointStore
+from .metrics import MetricsRecorder
+from .waste import WasteLedger
+from .profiling import PhaseTimer
+from .marginal import POSITIONS, marginal_values
+from .schedule import project_schedule
+from .cache import RESULT_CACHE_DIR, ResultCache
+from .estimate import fluid_estimate, estimate_error
+from .conditions import QueueEmpty, CivilianFactoriesAtLeast, StateSlotsFull, DateReached
+from .dates import day_to_date
+from .rules import RULES
 from .config import (
     MAJOR_COUNTRIES, BUILDING_TYPES, BUILDING_COSTS, STATE_CATEGORIES,
     DEFAULT_MAX_BUILDINGS, TRADE_LAWS, MOBILIZATION_LAWS, ECONOMIC_LAWS,
@@ -106,6 +121,10 @@ def state_to_dict(state: State) -> Dict[str, Any]:
 def initialize_session_state():
     if "settings" not in st.session_state:
         st.session_state.settings = DEFAULT_SETTINGS.copy()
+    if "checkpoints" not in st.session_state:
+        st.session_state.checkpoints = CheckpointStore()
+    if "branches" not in st.session_state:
+        st.session_state.branches = {}
     if "game" not in st.session_state:
         try:
             raw_states = st.session_state.settings["states"]
@@ -262,7 +281,7 @@ def render_state_settings():
                             "infrastructure": state.infrastructure,
                             "state_bonus": state.state_bonus,
                             "has_dam": state.has_dam,
-                            "buildings": state.buildings
+                            "buildings": state.buildings.copy()
                         })
             st.success("States updated successfully!")
             st.rerun()
@@ -527,7 +546,7 @@ def render_tech_settings():
             st.session_state.game.rubber_factory_max = rubber_factory_max
             for state in st.session_state.game.states.values():
                 state.max_buildings["synthetic_refinery"] = rubber_factory_max
-            st.session_state.game.law_manager.update_modifiers(construction_level)
+            st.session_state.game._update_modifiers()
             st.success("Technologies updated successfully!")
         except Exception as e:
             st.error(f"Error updating technologies: {e}")
@@ -599,7 +618,7 @@ def render_construction_projects():
             current_count = selected_state.infrastructure if bt == "infrastructure" else selected_state.buildings.get(bt, 0) if selected_state else 0
             max_count = selected_state.max_buildings.get(bt, DEFAULT_MAX_BUILDINGS[bt]) if selected_state else DEFAULT_MAX_BUILDINGS[bt]
             cost = BUILDING_COSTS.get(bt, 0)
-            is_slot_occupying = bt in ["civilian_factory", "military_factory", "dockyard", "synthetic_refinery", "fuel_silo", "rocket_site", "nuclear_reactor"]
+            is_slot_occupying = bool(RULES.occupies_slot[RULES.ids[bt]])
             available_slots = (selected_state.total_slots - selected_state.used_slots) if is_slot_occupying else max_count - current_count
             type_modifier = game.get_construction_speed_modifier(state_id, bt) if selected_state else 0.0
             st.markdown(f"""
@@ -627,45 +646,46 @@ def render_construction_projects():
     if not game.construction_queue:
         st.info("No construction projects in queue.")
     else:
+        schedule = project_schedule(game)
+        render_schedule_chart(game, schedule)
+        finish_days = dict(zip(schedule["uid"], schedule["finish_day"]))
         for i, project in enumerate(game.construction_queue):
             state = game.states[project.state_id]
             state_name = state.name
             speed_modifier = game.get_construction_speed_modifier(project.state_id, project.building_type)
             progress_percent = (project.progress / project.cost) * 100
             points_per_day = project.factories_assigned * CIVILIAN_FACTORY_OUTPUT * speed_modifier
-            remaining_days = (project.cost - project.progress) / points_per_day if points_per_day > 0 else float('inf')
-            remaining_days_display = '\u221E' if math.isinf(remaining_days) else f'{remaining_days:.1f}'
+            finish_day = finish_days.get(project.uid, math.nan)
+            remaining_days_display = '\u221E' if math.isnan(finish_day) else f'{finish_day - game.current_day:.0f} (day {finish_day:.0f}, {day_to_date(int(finish_day))})'
             st.markdown(f"""
                 <div class='queue-item'>
                     {project.quantity} {project.building_type.replace('_', ' ').title()} in {state_name} (ID {project.state_id})<br>
-                    Progress: {project.progress:.1f}/{project.cost:.1f} ({progress_percent:.1f}%)<br>
+                    Progress: {project.progress:.1f}/{project.cost:.1f} ({progress_percent:.1f}%) on the current unit<br>
                     <div style='{{background-color: #4CAF50; width: {progress_percent}%; height: 10px}}'></div>
                     Points per Day: {points_per_day:.1f}<br>
                     Factories Assigned: {project.factories_assigned}<br>
-                    Estimated Days Remaining: {remaining_days_display}
+                    Projected Days Remaining: {remaining_days_display}
                 </div>
             """, unsafe_allow_html=True)
             col1, col2, col3, col4 = st.columns(4)
             with col1:
                 if i > 0 and st.button("Up", key=f"up_{i}_{project.state_id}_{project.building_type}"):
                     if st.session_state.ctrl_pressed:
-                        game.construction_queue.pop(i)
-                        game.construction_queue.insert(0, project)
+                        game.construction_queue.move_to_front(project)
                     else:
-                        game.construction_queue[i], game.construction_queue[i-1] = game.construction_queue[i-1], game.construction_queue[i]
+                        game.construction_queue.move_up(project)
                     st.rerun()
             with col2:
                 if i < len(game.construction_queue) - 1 and st.button("Down", key=f"down_{i}_{project.state_id}_{project.building_type}"):
                     if st.session_state.ctrl_pressed:
-                        game.construction_queue.pop(i)
-                        game.construction_queue.append(project)
+                        game.construction_queue.move_to_back(project)
                     else:
-                        game.construction_queue[i], game.construction_queue[i+1] = game.construction_queue[i+1], game.construction_queue[i]
+                        game.construction_queue.move_down(project)
                     st.rerun()
             with col3:
                 current_count = state.buildings.get(project.building_type, 0)
                 max_count = state.max_buildings.get(project.building_type, DEFAULT_MAX_BUILDINGS[project.building_type])
-                is_slot_occupying = project.building_type in ["civilian_factory", "military_factory", "dockyard", "synthetic_refinery", "fuel_silo", "rocket_site", "nuclear_reactor"]
+                is_slot_occupying = bool(RULES.occupies_slot[project.type_id])
                 available_slots = (state.total_slots - state.used_slots) if is_slot_occupying else max_count - current_count
                 if available_slots > 0 and st.button("+1", key=f"plus_{i}_{project.state_id}_{project.building_type}"):
                     if st.session_state.ctrl_pressed:
@@ -674,7 +694,6 @@ def render_construction_projects():
                         new_quantity = 1
                     if new_quantity > 0:
                         project.quantity += new_quantity
-                        project.cost += new_quantity * BUILDING_COSTS[project.building_type]
                         if is_slot_occupying:
                             state.used_slots += new_quantity
                         st.success(f"Increased {project.building_type.replace('_', ' ').title()} quantity by {new_quantity} in {state_name}")
@@ -682,32 +701,68 @@ def render_construction_projects():
             with col4:
                 if st.button("-1", key=f"minus_{i}_{project.state_id}_{project.building_type}"):
                     if st.session_state.ctrl_pressed:
-                        game.construction_queue.pop(i)
-                        if project.building_type in ["civilian_factory", "military_factory", "dockyard", "synthetic_refinery", "fuel_silo", "rocket_site", "nuclear_reactor"]:
+                        game.construction_queue.remove(project)
+                        if RULES.occupies_slot[project.type_id]:
                             state.used_slots -= project.quantity
                         st.success(f"Removed {project.building_type.replace('_', ' ').title()} from queue in {state_name}")
                     else:
                         if project.quantity > 1:
                             project.quantity -= 1
-                            project.cost -= BUILDING_COSTS[project.building_type]
-                            if project.building_type in ["civilian_factory", "military_factory", "dockyard", "synthetic_refinery", "fuel_silo", "rocket_site", "nuclear_reactor"]:
+                            if RULES.occupies_slot[project.type_id]:
                                 state.used_slots -= 1
                             st.success(f"Decreased {project.building_type.replace('_', ' ').title()} quantity by 1 in {state_name}")
                         else:
-                            game.construction_queue.pop(i)
-                            if project.building_type in ["civilian_factory", "military_factory", "dockyard", "synthetic_refinery", "fuel_silo", "rocket_site", "nuclear_reactor"]:
+                            game.construction_queue.remove(project)
+                            if RULES.occupies_slot[project.type_id]:
                                 state.used_slots -= 1
                             st.success(f"Removed {project.building_type.replace('_', ' ').title()} from queue in {state_name}")
                     st.rerun()
 
         # Automatically assign factories, prioritizing top project
-        available_factories = game.available_civ_factories()
-        for project in game.construction_queue:
-            project.factories_assigned = 0
-        for project in game.construction_queue:
-            factories_to_assign = min(available_factories, MAX_FACTORIES_PER_PROJECT)
-            project.factories_assigned = factories_to_assign
-            available_factories -= factories_to_assign
+        game.construction_queue.reassign(game.available_civ_factories(), MAX_FACTORIES_PER_PROJECT)
+
+def render_schedule_chart(game: Game, schedule: pd.DataFrame):
+    with st.expander("Projected Schedule"):
+        chart = schedule.dropna(subset=["start_day"]).assign(
+            label=lambda df: [f"{i + 1}. {q} {bt.replace('_', ' ').title()} in {game.states[sid].name}" for i, q, bt, sid in zip(df["position"], df["quantity"], df["building_type"], df["state_id"])],
+            finish=lambda df: df["finish_day"].fillna(game.current_day + 10000)
+        )
+        if chart.empty:
+            st.caption("No project gets factories within 10000 days.")
+            return
+        st.altair_chart(
+            alt.Chart(chart).mark_bar().encode(
+                x=alt.X("start_day:Q", title="Day"),
+                x2="finish:Q",
+                y=alt.Y("label:N", sort=None, title=None),
+                color=alt.Color("building_type:N", title="Building Type"),
+                tooltip=["label", "start_day", "finish_day"]
+            ).properties(height=max(120, 18 * len(chart)))
+        )
+
+def render_marginal_value_panel():
+    if not hasattr(st.session_state, "game") or not st.session_state.game:
+        return
+    game = st.session_state.game
+    with st.expander("Marginal Value per Extra Building"):
+        st.caption("Simulates one extra unit of each building type in each state and compares it with the current queue.")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            target_day = st.number_input("Target Day", min_value=game.current_day + 1, max_value=game.current_day + 10000, value=max(game.current_day + 1, 1338), step=1, key="marginal_target_day")
+        with col2:
+            position = st.selectbox("Queue Position", POSITIONS, key="marginal_position")
+        with col3:
+            building_types = st.multiselect("Building Types", BUILDING_TYPES, default=["civilian_factory", "military_factory", "dockyard", "infrastructure"], key="marginal_types")
+        if st.button("Compute Marginal Values"):
+            try:
+                with st.spinner("Simulating extra buildings..."):
+                    st.session_state.marginal_values = marginal_values(game, target_day, position, building_types, max_workers=os.cpu_count() or 1)
+            except Exception as e:
+                st.error(f"Error computing marginal values: {e}")
+        table = st.session_state.get("marginal_values")
+        if table is not None:
+            table = table.assign(state_id=[game.states[sid].name if sid in game.states else sid for sid in table["state_id"]])
+            st.dataframe(table.rename(columns={"state_id": "State", "building_type": "Building Type"}), hide_index=True)
 
 def render_simulation_controls():
     st.subheader("Simulation Controls")
@@ -717,14 +772,58 @@ def render_simulation_controls():
     col1, col2, col3 = st.columns(3)
     with col1:
         days_to_simulate = st.number_input("Days to Simulate", min_value=1, max_value=10000, value=1, step=1)
+        run_until = st.selectbox("Run Until", ["Days simulated", "Queue empty", "Civilian factories reached", "State slots full", "Date"], help="Stop early once the condition holds; Days to Simulate caps the run.")
+        condition = None
+        if run_until == "Queue empty":
+            condition = QueueEmpty()
+        elif run_until == "Civilian factories reached":
+            condition = CivilianFactoriesAtLeast(st.number_input("Civilian Factories", min_value=0, value=st.session_state.game.total_civ_factories + 10, step=1))
+        elif run_until == "State slots full":
+            states = st.session_state.game.states
+            condition = StateSlotsFull(st.selectbox("State", list(states), format_func=lambda sid: f"{states[sid].name} (ID {sid})", key="run_until_state"))
+        elif run_until == "Date":
+            run_until_date = st.text_input("Date (year.month.day)", value=day_to_date(st.session_state.game.current_day + days_to_simulate))
+        event_driven = st.checkbox("Event-driven engine", value=True, help="Skip ahead between completions, law changes and tech unlocks instead of stepping every day.")
+        record_metrics = st.checkbox("Record metrics", value=True, help="Keep per-day factory, construction and production figures and the wasted and idle capacity for the charts below.")
     with col2:
         if st.button("Simulate"):
             try:
-                st.session_state.game.simulate_days(days_to_simulate)
-                st.success(f"Simulated {days_to_simulate} days successfully!")
+                if not record_metrics:
+                    st.session_state.game.recorder = None
+                    st.session_state.game.waste = None
+                else:
+                    if st.session_state.game.recorder is None:
+                        st.session_state.game.recorder = MetricsRecorder()
+                    if st.session_state.game.waste is None:
+                        st.session_state.game.waste = WasteLedger()
+                # The fluid estimate takes milliseconds, so show it while the exact run is going
+                st.caption("Quick estimate")
+                st.line_chart(fluid_estimate(st.session_state.game, days_to_simulate).to_frame()[["civilian_factories", "military_factories", "dockyards"]])
+                if run_until == "Date":
+                    condition = DateReached(run_until_date)
+                start_day = st.session_state.game.current_day
+                timer = PhaseTimer() if st.session_state.get("profile_runs") else None
+                with st.spinner("Simulating..."), timer or nullcontext():
+                    reached = st.session_state.checkpoints.run(st.session_state.game, days_to_simulate, fast=event_driven, condition=condition)
+                if timer is not None:
+                    st.session_state.profile = timer
+                if condition is not None and reached is None:
+                    st.warning(f"Stopped after {days_to_simulate} days before reaching {condition}")
+                else:
+                    st.success(f"Simulated {st.session_state.game.current_day - start_day} days successfully!")
                 st.rerun()
             except Exception as e:
                 st.error(f"Error during simulation: {e}")
+        store = st.session_state.checkpoints
+        if store.game is st.session_state.game and store.days and st.session_state.game.current_day < store.last_day:
+            if st.button(f"Re-simulate Edits to Day {store.last_day}", help="Keep the simulated days your edits cannot have changed and re-run the rest."):
+                try:
+                    resume = store.resimulate(st.session_state.game, fast=event_driven)
+                    st.session_state.game = store.game
+                    st.success(f"Re-simulated from day {resume}")
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Error during simulation: {e}")
     with col3:
         if st.button("Reset Simulation"):
             try:
@@ -743,13 +842,33 @@ def render_simulation_controls():
                     k: v for k, v in st.session_state.settings.items()
                     if k in valid_game_params
                 }
-                st.session_state.game = Game(states=states, **game_settings)
-                # Ensure settings["states"] contains dictionaries
+                # Ensure settings["states"] contains dictionaries; Game takes them as dicts too
                 st.session_state.settings["states"] = [state_to_dict(s) for s in states]
+                st.session_state.game = Game(states=st.session_state.settings["states"], **game_settings)
+                st.session_state.checkpoints.clear()
                 st.success("Simulation reset successfully!")
                 st.rerun()
             except Exception as e:
                 st.error(f"Error resetting simulation: {e}")
+    with st.expander("Performance"):
+        st.checkbox("Profile simulation runs", key="profile_runs", help="Time each simulation phase; adds some overhead while enabled.")
+        render_phase_timings(st.session_state.get("profile"))
+
+def render_phase_timings(timer: PhaseTimer):
+    if timer is None or not timer.calls:
+        st.caption("No profiled run yet.")
+        return
+    per_day = timer.seconds_per_day
+    st.write(f"**Profiled Time**: {timer.total_seconds:.3f} s over {timer.days} days" + (f" ({per_day * 1e6:.1f} µs per day)" if per_day is not None else ""))
+    st.dataframe(timer.to_frame().style.format({"seconds": "{:.4f}", "self_seconds": "{:.4f}", "self_share": "{:.1%}", "us_per_call": "{:.2f}"}))
+
+def render_cache_stats(stats: Dict[str, int]):
+    lookups = sum(stats.values())
+    hits = stats["memory_hits"] + stats["disk_hits"]
+    st.write(
+        f"**Result Cache**: {hits} of {lookups} lookups hit ({hits / lookups if lookups else 0.0:.0%}): "
+        f"{stats['memory_hits']} in memory, {stats['disk_hits']} on disk, {stats['misses']} misses"
+    )
 
 def render_simulation_output():
     st.subheader("Simulation Output")
@@ -757,7 +876,8 @@ def render_simulation_output():
         st.warning("No game state loaded. Please load states first.")
         return
     game = st.session_state.game
-    st.write(f"**Current Day**: {game.current_day}")
+    st.write(f"**Current Day**: {game.current_day} ({day_to_date(game.current_day)})")
+    render_checkpoint_scrubber(game)
     st.write(f"**Total Civilian Factories**: {game.total_civ_factories}")
     st.write(f"**Total Military Factories**: {game.total_mil_factories}")
     st.write(f"**Total Dockyards**: {game.total_dockyards}")
@@ -766,6 +886,9 @@ def render_simulation_output():
     st.write(f"**Total Construction Points per Day**: {game.total_construction_points_per_day():.2f}")
     st.write(f"**Military Production**: {game.military_production:.2f}")
     st.write(f"**Naval Production**: {game.naval_production:.2f}")
+    render_metrics_history(game)
+    render_waste(game)
+    render_quick_estimate(game)
     st.write("**State Details**:")
     state_data = [
         {
@@ -806,4 +929,218 @@ def render_simulation_output():
                     }},
                     "plugins": {{ "legend": {{ "display": true }} }}
                 }}
-            }}""")
\ No newline at end of file
+            }}""")
+
+def render_metrics_history(game: Game):
+    recorder = game.recorder
+    if recorder is None or not len(recorder):
+        return
+    st.write("**History**:")
+    frame = recorder.to_frame(daily=True)
+    st.line_chart(frame[["total_civ_factories", "total_mil_factories", "total_dockyards", "available_civ_factories"]])
+    st.line_chart(frame[["construction_points", "military_production"]])
+    target = st.number_input("First Day With Civilian Factories At Least", min_value=0, value=int(recorder.running_max["total_civ_factories"][len(recorder) - 1]), step=1)
+    first_day = recorder.first_day_at_least("total_civ_factories", target)
+    st.write(f"Reached on day {first_day}" if first_day is not None else "Not reached in the recorded days")
+
+def render_waste(game: Game):
+    ledger = game.waste
+    if ledger is None or not len(ledger):
+        return
+    st.write("**Lost Construction**:")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Wasted Points", f"{ledger.totals['wasted_points']:.1f}", help="Progress past a building's cost on the day it completes")
+    col2.metric("Idle Factory-Days", f"{ledger.totals['idle_factory_days']:.0f}", help="Available civilian factories without a project")
+    col3.metric("Points Lost to Cap", f"{ledger.totals['cap_lost_points']:.1f}", help=f"What idle factories would have built without the {MAX_FACTORIES_PER_PROJECT}-factory limit per project")
+    show_cumulative = st.checkbox("Cumulative", value=True, key="waste_cumulative")
+    st.line_chart(ledger.to_frame(cumulative=show_cumulative))
+    by_source = ledger.by_source().reset_index()
+    by_source["state_id"] = [game.states[int(sid)].name if pd.notna(sid) and int(sid) in game.states else "-" for sid in by_source["state_id"]]
+    st.dataframe(by_source.rename(columns={"state_id": "State", "building_type": "Building Type"}), hide_index=True)
+
+def render_quick_estimate(game: Game):
+    with st.expander("Quick Estimate (1936-1945)"):
+        st.caption("Continuous approximation of the current queue; factories count fractionally while under construction.")
+        days = max(1, 3650 - game.current_day)
+        st.line_chart(fluid_estimate(game, days).to_frame())
+        if st.button("Report Estimate Error"):
+            report = estimate_error(game, days)
+            st.table(pd.DataFrame(report).T)
+
+def render_checkpoint_scrubber(game: Game):
+    store = st.session_state.checkpoints
+    if store.game is game and store.first_day < store.last_day and store.first_day <= game.current_day <= store.last_day:
+        day = st.slider("Scrub to Day", min_value=store.first_day, max_value=store.last_day, value=game.current_day)
+        if day != game.current_day:
+            st.session_state.game = store.restore(day)
+            st.rerun()
+    with st.expander("Checkpoints"):
+        st.write(f"{len(store.days)} checkpoints every {store.interval} days ({store.size / 1024:.0f} KiB)")
+        col1, col2 = st.columns(2)
+        with col1:
+            # Downloaded rather than written on the server, where all sessions of a hosted app would share one file;
+            # the file is only built when the button is clicked
+            st.download_button("Save Checkpoints", data=store.dumps, file_name="checkpoints.hgp", mime="application/octet-stream", disabled=not store.days)
+        with col2:
+            uploaded = st.file_uploader("Checkpoint File", type=["hgp"], help="A file saved with Save Checkpoints on this server.")
+            if st.button("Load Checkpoints", disabled=uploaded is None):
+                try:
+                    store = CheckpointStore.loads(uploaded.getvalue())
+                    st.session_state.game = store.restore(store.last_day)
+                    st.session_state.checkpoints = store
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Error loading checkpoints: {e}")
+
+def render_branch_panel():
+    st.subheader("What-if Branches")
+    if not hasattr(st.session_state, "game") or not st.session_state.game:
+        st.warning("No game state loaded. Please load states first.")
+        return
+    game = st.session_state.game
+    branches = st.session_state.branches
+    col1, col2 = st.columns(2)
+    with col1:
+        name = st.text_input("Branch Name", value=f"Branch {len(branches) + 1}")
+        if st.button("Fork Current Game"):
+            if not name or name in branches:
+                st.error(f"Branch name '{name}' is empty or already used")
+            else:
+                branches[name] = game.fork()
+                st.rerun()
+    if not branches:
+        st.info("No branches yet. Fork the current game to try a what-if.")
+        return
+    with col2:
+        selected = st.selectbox("Branch", options=list(branches))
+        branch = branches[selected]
+        law_type = st.selectbox("Law Type", options=["trade", "economic", "mobilization"], format_func=lambda x: x.title(), key="branch_law_type")
+        law_options = {"trade": TRADE_LAWS, "economic": ECONOMIC_LAWS, "mobilization": MOBILIZATION_LAWS}[law_type]
+        new_law = st.selectbox("New Law", options=list(law_options), format_func=lambda x: x.replace('_', ' ').title(), key="branch_new_law")
+        law_day = st.number_input("Change Day", min_value=branch.current_day + 1, value=branch.current_day + 1, step=1, key="branch_law_day")
+        if st.button("Schedule Law Change"):
+            branch.law_manager.law_changes = (*branch.law_manager.law_changes, LawChange(int(law_day), law_type, new_law))
+            st.success(f"{selected}: {law_type} law changes to {new_law.replace('_', ' ').title()} on day {int(law_day)}")
+        branch_days = st.number_input("Branch Days to Simulate", min_value=1, max_value=10000, value=100, step=1, key="branch_days")
+        b1, b2, b3 = st.columns(3)
+        with b1:
+            if st.button("Simulate Branch"):
+                branch.simulate_days_fast(int(branch_days))
+                st.rerun()
+        with b2:
+            if st.button("Make Active"):
+                st.session_state.game = branch.fork()
+                st.rerun()
+        with b3:
+            if st.button("Delete Branch"):
+                del branches[selected]
+                st.rerun()
+    rows = [{"Branch": "Active game", **summarize(game)}]
+    rows += [{"Branch": branch_name, **summarize(g)} for branch_name, g in branches.items()]
+    st.dataframe(pd.DataFrame(rows))
+
+def parse_number_list(text: str, cast=float) -> List:
+    return [cast(v.strip()) for v in text.split(",") if v.strip()]
+
+def render_sweep_panel():
+    st.subheader("Parameter Sweep")
+    if not hasattr(st.session_state, "game") or not st.session_state.game:
+        st.warning("No game state loaded. Please load states first.")
+        return
+    settings = st.session_state.settings
+    col1, col2 = st.columns(2)
+    with col1:
+        trade_laws = st.multiselect("Trade Laws", options=list(TRADE_LAWS.keys()), default=[settings["trade_law"]], format_func=lambda x: x.replace('_', ' ').title())
+        economic_laws = st.multiselect("Economic Laws", options=list(ECONOMIC_LAWS.keys()), default=[settings["economic_law"]], format_func=lambda x: x.replace('_', ' ').title())
+        construction_delays = st.text_input("Construction Tech Delays (days, comma separated)", value="0")
+        industry_delays = st.text_input("Industry Tech Delays (days, comma separated)", value="0")
+    with col2:
+        stability_values = st.text_input("Stability Values", value=str(settings.get("stability", 50.0)))
+        war_support_values = st.text_input("War Support Values", value=str(settings.get("war_support", 0.0)))
+        sweep_days = st.number_input("Days per Run", min_value=1, max_value=10000, value=1000, step=1, key="sweep_days")
+        workers = st.number_input("Worker Processes", min_value=1, max_value=os.cpu_count() or 1, value=os.cpu_count() or 1, step=1)
+        profile_sweep = st.checkbox("Profile workers", value=False, help="Report where the workers spent their time.")
+        use_cache = st.checkbox("Use result cache", value=True, help=f"Reuse results of identical runs stored in {RESULT_CACHE_DIR}/.")
+    try:
+        ranges = {
+            "trade_law": trade_laws,
+            "economic_law": economic_laws,
+            "construction_days": parse_number_list(construction_delays, int),
+            "industry_days": parse_number_list(industry_delays, int),
+            "stability": parse_number_list(stability_values),
+            "war_support": parse_number_list(war_support_values)
+        }
+    except ValueError as e:
+        st.error(f"Invalid sweep values: {e}")
+        return
+    st.write(f"Grid size: {len(sweep_grid(ranges))} runs")
+    if st.button("Run Sweep"):
+        placeholder = st.empty()
+        progress = st.progress(0.0)
+        total = len(sweep_grid(ranges))
+        results = []
+        timer = PhaseTimer() if profile_sweep else None
+        cache_stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0} if use_cache else None
+        try:
+            for result in run_sweep(st.session_state.game, ranges, sweep_days, max_workers=workers, profile=profile_sweep, cache_dir=RESULT_CACHE_DIR if use_cache else None):
+                if timer is not None:
+                    timer.merge(result.pop("profile"), result.pop("profile_days"))
+                for name, count in result.pop("cache_stats", {}).items():
+                    cache_stats[name] += count
+                results.append(result)
+                progress.progress(len(results) / total)
+                placeholder.dataframe(pd.DataFrame(results))
+            st.session_state.sweep_results = results
+            st.session_state.sweep_profile = timer
+            st.session_state.sweep_cache_stats = cache_stats
+            cached = sum(result.get("cached", False) for result in results)
+            st.success(f"Completed {len(results)} runs" + (f" ({cached} from the result cache, {len(results) - cached} simulated)" if use_cache else ""))
+        except Exception as e:
+            st.error(f"Error during sweep: {e}")
+    elif st.session_state.get("sweep_results"):
+        st.dataframe(pd.DataFrame(st.session_state.sweep_results))
+    if use_cache and os.path.isdir(RESULT_CACHE_DIR):
+        cache = ResultCache(RESULT_CACHE_DIR)
+        st.caption(f"Result cache: {cache.disk_bytes / 1024 / 1024:.1f} MB on disk")
+        if st.button("Clear Result Cache"):
+            cache.clear()
+            st.rerun()
+    if st.session_state.get("sweep_profile") is not None or st.session_state.get("sweep_cache_stats") is not None:
+        with st.expander("Performance"):
+            if st.session_state.get("sweep_cache_stats") is not None:
+                render_cache_stats(st.session_state.sweep_cache_stats)
+            if st.session_state.get("sweep_profile") is not None:
+                render_phase_timings(st.session_state.sweep_profile)
+
+def render_monte_carlo_panel():
+    st.subheader("Monte Carlo")
+    if not hasattr(st.session_state, "game") or not st.session_state.game:
+        st.warning("No game state loaded. Please load states first.")
+        return
+    game = st.session_state.game
+    col1, col2 = st.columns(2)
+    with col1:
+        runs = st.number_input("Runs", min_value=1, max_value=10000, value=100, step=1)
+        mc_days = st.number_input("Days per Run", min_value=1, max_value=10000, value=1000, step=1, key="mc_days")
+        seed = st.number_input("Seed", min_value=0, value=0, step=1)
+    with col2:
+        tech_day_sd = st.number_input("Tech Unlock Day Std Dev", min_value=0.0, value=30.0, step=1.0)
+        law_day_sd = st.number_input("Law Change Day Std Dev", min_value=0.0, value=30.0, step=1.0)
+        stability_sd = st.number_input("Stability Std Dev", min_value=0.0, value=5.0, step=0.5)
+    if st.button("Run Monte Carlo"):
+        try:
+            with st.spinner(f"Simulating {runs} runs..."):
+                st.session_state.monte_carlo = run_monte_carlo(
+                    game,
+                    mc_days,
+                    runs,
+                    seed=seed,
+                    uncertainty=Uncertainty(tech_day_sd, law_day_sd, stability_sd)
+                )
+        except Exception as e:
+            st.error(f"Error during Monte Carlo run: {e}")
+    result = st.session_state.get("monte_carlo")
+    if result:
+        metric = st.selectbox("Metric", options=METRICS, format_func=lambda x: x.replace('_', ' ').title())
+        st.line_chart(pd.DataFrame({f"P{p}": result.band(metric, p) for p in result.percentiles}, index=range(result.start_day + 1, result.start_day + result.days + 1)))
+        st.caption(f"{result.runs} runs, seed {result.seed}")
@@ -0,0 +1,78 @@
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+# Per-day amounts a ledger row holds for each of its days
+COUNTERS = ["wasted_points", "idle_factory_days", "cap_lost_points"]
+
+
+class WasteLedger:
+    """Construction capacity a Game loses, per day and per state and building type.
+
+    - wasted_points: progress past a unit's cost on the day it completes, which the game discards
+    - idle_factory_days: available civilian factories left without a project
+    - cap_lost_points: what those idle factories would have added to the head of the queue if
+      projects were not limited to MAX_FACTORIES_PER_PROJECT
+
+    Idle factories with an empty queue are booked without a state or building type. Rows cover
+    `days` consecutive days with the same amounts, so daily and event-driven runs record the same rows.
+    """
+
+    def __init__(self):
+        # (first day, days, state id, building type, wasted points, idle factories, cap lost points) per row
+        self.rows: List[Tuple[int, int, Optional[int], Optional[str], float, int, float]] = []
+        self.totals: Dict[str, float] = {name: 0.0 for name in COUNTERS}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def copy(self) -> "WasteLedger":
+        ledger = WasteLedger()
+        ledger.rows = list(self.rows)
+        ledger.totals = dict(self.totals)
+        return ledger
+
+    def clear(self):
+        self.rows.clear()
+        self.totals = {name: 0.0 for name in COUNTERS}
+
+    def overflow(self, day: int, state_id: int, building_type: str, points: float):
+        if points > 0:
+            self.rows.append((day, 1, state_id, building_type, points, 0, 0.0))
+            self.totals["wasted_points"] += points
+
+    def idle(self, day: int, factories: int, days: int = 1, state_id: Optional[int] = None, building_type: Optional[str] = None, cap_lost: float = 0.0):
+        """Book `factories` idle factories for `days` days; cap_lost is the daily points they could have added."""
+        if factories <= 0 or days <= 0:
+            return
+        self.totals["idle_factory_days"] += factories * days
+        self.totals["cap_lost_points"] += cap_lost * days
+        if self.rows:
+            first, length, *key = self.rows[-1]
+            if first + length == day and key == [state_id, building_type, 0.0, factories, cap_lost]:
+                self.rows[-1] = (first, length + days, state_id, building_type, 0.0, factories, cap_lost)
+                return
+        self.rows.append((day, days, state_id, building_type, 0.0, factories, cap_lost))
+
+    def _frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.rows, columns=["day", "days", "state_id", "building_type", *COUNTERS])
+
+    def to_frame(self, cumulative: bool = False) -> pd.DataFrame:
+        """Per-day totals indexed by day, or running totals with cumulative=True."""
+        rows = self._frame()
+        if rows.empty:
+            return pd.DataFrame(columns=COUNTERS, index=pd.Index([], name="day"), dtype=float)
+        days = np.repeat(rows["day"].to_numpy(), rows["days"].to_numpy())
+        days += np.concatenate([np.arange(n) for n in rows["days"]])
+        expanded = pd.DataFrame({name: np.repeat(rows[name].to_numpy(dtype=float), rows["days"].to_numpy()) for name in COUNTERS}, index=days)
+        frame = expanded.groupby(level=0).sum()
+        frame = frame.reindex(pd.RangeIndex(int(frame.index.min()), int(frame.index.max()) + 1), fill_value=0.0)
+        frame.index.name = "day"
+        return frame.cumsum() if cumulative else frame
+
+    def by_source(self) -> pd.DataFrame:
+        """Cumulative counters per state and building type; idle factories with an empty queue have neither."""
+        rows = self._frame()
+        for name in COUNTERS:
+            rows[name] = rows[name] * rows["days"]
+        return rows.fillna({"building_type": "(empty queue)"}).groupby(["state_id", "building_type"], dropna=False)[COUNTERS].sum()
@@ -0,0 +1,36 @@
+import pytest
+from src.batch import BatchSimulation
+from src.metrics import MetricsRecorder
+from src.waste import WasteLedger
+from tests.test_game import make_game, snapshot
+
+
+def test_write_back_matches_daily_steps_with_the_bookkeeping():
+    game = make_game()
+    game.states[1].buildings["civilian_factory"] = 40
+    game.add_to_queue(3, "civilian_factory", 2)
+    game.recorder = MetricsRecorder()
+    game.waste = WasteLedger()
+    reference = game.fork()
+    batch = BatchSimulation([game.fork(), game.fork()])
+    for _ in range(4):
+        reference.simulate_days(150)
+        batch.simulate_days(150)
+        batch.write_back()
+        for candidate in batch.games:
+            assert snapshot(candidate) == snapshot(reference)
+            assert candidate.recorder.to_frame().equals(reference.recorder.to_frame())
+            assert candidate.waste.rows == pytest.approx(reference.waste.rows)
+    assert reference.spare_days
+    assert game.current_day == 0 and len(game.recorder) == 0
+
+
+def test_write_back_invalidates_the_speed_cache_of_raised_infrastructure():
+    game = make_game()
+    game.states[1].buildings["civilian_factory"] = 40
+    before = game.get_construction_speed_modifier(3, "civilian_factory")
+    batch = BatchSimulation([game])
+    batch.simulate_days(400)
+    batch.write_back()
+    assert game.states[3].infrastructure == 3
+    assert game.get_construction_speed_modifier(3, "civilian_factory") > before
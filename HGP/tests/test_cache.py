@@ -0,0 +1,25 @@
+from src.cache import ResultCache, scenario_hash, simulate_cached
+from tests.test_game import make_game
+
+
+def test_requeued_scenario_hits_the_cache_under_its_own_uids():
+    game = make_game()
+    requeued = make_game()
+    # Same queue contents, but every project gets a new uid
+    for project in list(requeued.construction_queue):
+        requeued.construction_queue.remove(project)
+        requeued.add_to_queue(project.state_id, project.building_type, project.quantity)
+    assert [p.uid for p in game.construction_queue] != [p.uid for p in requeued.construction_queue]
+    assert scenario_hash(game) == scenario_hash(requeued)
+
+    cache = ResultCache(None)
+    expected = simulate_cached(game, 120, cache)
+    result = simulate_cached(requeued, 120, cache)
+    assert cache.stats == {"memory_hits": 1, "disk_hits": 0, "misses": 1}
+    queued = {p.uid for p in requeued.construction_queue}
+    assert {p.uid for p in result.construction_queue} <= queued
+    assert set(result.first_funded) <= queued
+    assert result.construction_queue.next_uid == requeued.construction_queue.next_uid
+    assert [(p.state_id, p.type_id, p.quantity, p.progress) for p in result.construction_queue] == \
+        [(p.state_id, p.type_id, p.quantity, p.progress) for p in expected.construction_queue]
+    assert result.total_civ_factories == expected.total_civ_factories
@@ -0,0 +1,53 @@
+import pytest
+from src.checkpoints import CheckpointStore
+from src.golden import _diff, fingerprint
+from tests.test_game import make_game
+
+KEY = b"test key"
+
+
+def checkpointed_game(days=90):
+    game = make_game()
+    store = CheckpointStore(interval=10)
+    store.capture(game, pinned=True)
+    for _ in range(days // 10):
+        game.simulate_days(10)
+        store.capture(game)
+    return game, store
+
+
+def test_saved_checkpoints_load_only_with_the_signing_key():
+    game, store = checkpointed_game()
+    blob = store.dumps(KEY)
+    loaded = CheckpointStore.loads(blob, KEY)
+    assert loaded.days == store.days
+    assert loaded.restore(loaded.last_day).current_day == game.current_day
+    with pytest.raises(ValueError):
+        CheckpointStore.loads(blob[:-1] + bytes([blob[-1] ^ 1]), KEY)
+    with pytest.raises(ValueError):
+        CheckpointStore.loads(blob, b"another key")
+
+
+@pytest.mark.parametrize("edit", [
+    lambda game: game.add_to_queue(3, "civilian_factory", 2),
+    lambda game: game.construction_queue.move_to_front(game.construction_queue.tail),
+    lambda game: game.construction_queue.remove(game.construction_queue.head),
+    lambda game: game.law_manager.apply_law_change(game.current_day + 50, "economic", "war_economy")
+])
+def test_resimulate_matches_a_full_rerun(edit):
+    game = make_game()
+    game.states[1].buildings["civilian_factory"] = 20
+    for project in [("civilian_factory", 3), ("military_factory", 2), ("infrastructure", 1)]:
+        game.add_to_queue(1, *project)
+    store = CheckpointStore(interval=25)
+    store.run(game, 300)
+    store.run(game, 200)
+    restored = store.restore(120)
+    reference = restored.fork()
+    edit(restored)
+    edit(reference)
+    store.resimulate(restored)
+    reference.simulate_days_fast(300 - reference.current_day)
+    reference.simulate_days_fast(200)
+    assert store.game.current_day == 500
+    assert _diff(fingerprint(reference), fingerprint(store.game), atol=1e-6) == []
@@ -0,0 +1,37 @@
+import pytest
+from src.conditions import AnyOf, CivilianFactoriesAtLeast, DateReached, QueueEmpty
+from src.dates import date_to_day, day_to_date
+from tests.test_game import make_game
+
+
+def test_dates_round_trip():
+    assert day_to_date(0) == "1936.1.1"
+    assert date_to_day("1939.9.1") == 3 * 365 + 243
+    for day in range(0, 6 * 365):
+        assert date_to_day(day_to_date(day)) == day
+
+
+@pytest.mark.parametrize("date", ["1935.12.31", "1936.2.29", "1936.13.1", "1936.4.31", "1936.1", "soon"])
+def test_invalid_dates_are_rejected(date):
+    with pytest.raises(ValueError):
+        date_to_day(date)
+
+
+@pytest.mark.parametrize("condition", [
+    DateReached("1936.7.4"),
+    CivilianFactoriesAtLeast(11),
+    QueueEmpty(),
+    AnyOf(CivilianFactoriesAtLeast(100), DateReached(200))
+])
+def test_fast_and_daily_runs_stop_on_the_same_day(condition):
+    daily, fast = make_game(), make_game()
+    reached = daily.simulate_until(condition, max_days=3000, fast=False)
+    assert reached is not None and condition(daily)
+    assert fast.simulate_until(condition, max_days=3000) == reached
+    assert fast.total_civ_factories == daily.total_civ_factories
+
+
+def test_unreached_condition_stops_at_max_days():
+    game = make_game()
+    assert game.simulate_until(CivilianFactoriesAtLeast(1000), max_days=250) is None
+    assert game.current_day == 250
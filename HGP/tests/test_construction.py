@@ -0,0 +1,78 @@
+import pickle
+import pytest
+from src.construction import ConstructionProject, ConstructionQueue
+from src.rules import RULES
+from tests.test_game import make_game
+
+
+def project(state_id: int, quantity: int = 1) -> ConstructionProject:
+    return ConstructionProject(state_id, RULES.id("civilian_factory"), quantity)
+
+
+def order(queue: ConstructionQueue) -> list:
+    return [p.state_id for p in queue]
+
+
+def test_moves_and_positional_edits_keep_the_links_consistent():
+    a, b, c, d = (project(i) for i in range(1, 5))
+    queue = ConstructionQueue([a, b, c])
+    queue.move_to_front(c)
+    assert order(queue) == [3, 1, 2]
+    queue.move_down(c)
+    queue.move_down(c)
+    queue.move_down(c)
+    assert order(queue) == [1, 2, 3]
+    queue.move_up(b)
+    queue.move_to_back(b)
+    assert order(queue) == [1, 3, 2]
+    queue.insert(1, d)
+    assert order(queue) == [1, 4, 3, 2] and queue.index(d) == 1
+    assert queue.pop(0) is a and queue.pop() is b
+    assert order(queue) == [4, 3] and len(queue) == 2
+    assert (queue.head, queue.tail) == (d, c)
+    assert [p.uid for p in [a, b, c, d]] == [1, 2, 3, 4] and queue.next_uid == 5
+
+
+def test_remove_rejects_projects_of_another_queue():
+    a, b = project(1), project(2)
+    queue = ConstructionQueue([a])
+    other = ConstructionQueue([project(3), b])
+    with pytest.raises(ValueError):
+        queue.remove(b)
+    assert order(other) == [3, 2]
+    other.remove(b)
+    queue.append(b)
+    queue.remove(a)
+    assert order(queue) == [2]
+    with pytest.raises(ValueError):
+        queue.remove(a)
+
+
+def test_copies_and_pickles_are_independent_queues():
+    queue = ConstructionQueue([project(1), project(2, quantity=3)])
+    for clone in (queue.copy(), pickle.loads(pickle.dumps(queue))):
+        assert [(p.uid, p.state_id, p.quantity) for p in clone] == [(p.uid, p.state_id, p.quantity) for p in queue]
+        assert clone.next_uid == queue.next_uid
+        clone.remove(clone.head)
+        with pytest.raises(ValueError):
+            clone.remove(queue.head)
+        assert len(queue) == 2
+
+
+def test_grouped_entry_builds_its_units_one_after_another():
+    game = make_game()
+    game.construction_queue = ConstructionQueue()
+    game.add_to_queue(1, "civilian_factory", 3)
+    grouped = game.construction_queue.head
+    civ = game.total_civ_factories
+    finished = []
+    while game.construction_queue:
+        game.simulate_days(1)
+        if game.total_civ_factories > civ + len(finished):
+            finished.append(game.current_day)
+            assert grouped.quantity == 3 - len(finished)
+            if grouped.quantity:
+                # The next unit starts from scratch in the same entry
+                assert grouped.progress == 0.0 and game.construction_queue.head is grouped
+    assert len(finished) == 3 and len(set(finished)) == 3
+    assert game.total_civ_factories == civ + 3
@@ -0,0 +1,108 @@
+import logging
+import pandas as pd
+import pytest
+from src.game import Game
+from src.laws import LawChange
+from src.metrics import MetricsRecorder
+
+logging.disable(logging.INFO)
+
+
+def make_game(**settings) -> Game:
+    states = [
+        {"id": 1, "name": "Berlin", "category": "megalopolis", "infrastructure": 4,
+         "buildings": {"civilian_factory": 6, "military_factory": 2, "dockyard": 1}},
+        {"id": 2, "name": "Hamburg", "category": "metropolis", "infrastructure": 3,
+         "buildings": {"civilian_factory": 3, "dockyard": 2}},
+        {"id": 3, "name": "Bitburg", "category": "rural", "infrastructure": 2, "buildings": {}}
+    ]
+    game = Game(states=states, **settings)
+    game.add_to_queue(1, "civilian_factory", 2)
+    game.add_to_queue(2, "military_factory", 1)
+    game.add_to_queue(3, "infrastructure", 1)
+    return game
+
+
+@pytest.mark.parametrize("edit", [
+    lambda state: state.buildings.__setitem__("civilian_factory", 9),
+    lambda state: state.buildings.__setitem__("dockyard", 0),
+    lambda state: setattr(state, "buildings", {"military_factory": 4})
+])
+def test_state_edits_keep_factory_totals(edit):
+    game = make_game()
+    game.simulate_days(30)
+    edit(game.states[2])
+    game._check_factory_totals()
+    game.simulate_days(200)
+    game._check_factory_totals()
+
+
+def test_state_edits_on_a_fork_leave_the_original_totals():
+    game = make_game()
+    totals = (game.total_civ_factories, game.total_mil_factories, game.total_dockyards)
+    branch = game.fork()
+    branch.states[1].buildings["civilian_factory"] = 0
+    branch._check_factory_totals()
+    game._check_factory_totals()
+    assert (game.total_civ_factories, game.total_mil_factories, game.total_dockyards) == totals
+    assert branch.total_civ_factories == totals[0] - 6
+
+
+def snapshot(game: Game) -> tuple:
+    return (
+        game.current_day,
+        {sid: (state.buildings.copy(), state.infrastructure, state.used_slots) for sid, state in game.states.items()},
+        [(p.uid, p.state_id, p.building_type, p.quantity, p.factories_assigned) for p in game.construction_queue],
+        (game.total_civ_factories, game.total_mil_factories, game.total_dockyards),
+        game.first_funded,
+        game.spare_days
+    )
+
+
+def test_fast_engine_matches_daily_steps_on_a_mixed_queue():
+    daily = make_game(economic_law="civilian_economy", construction_level=2, construction_days=[90, 300, 0, 0, 0])
+    # Enough factories that the tail of the queue leaves some idle before it runs out
+    daily.states[1].buildings["civilian_factory"] = 40
+    daily.add_to_queue(3, "civilian_factory", 3)
+    daily.add_to_queue(1, "infrastructure", 1)
+    daily.add_to_queue(2, "bunker", 2)
+    daily.law_manager.law_changes = [LawChange(150, "economic", "partial_mobilization")]
+    daily.recorder = MetricsRecorder()
+    fast = daily.fork()
+    for _ in range(16):
+        daily.simulate_days(100)
+        fast.simulate_days_fast(100)
+        assert snapshot(fast) == snapshot(daily)
+        assert [p.progress for p in fast.construction_queue] == pytest.approx([p.progress for p in daily.construction_queue], abs=1e-6)
+    assert not daily.construction_queue
+    assert daily.spare_days
+    pd.testing.assert_frame_equal(fast.recorder.to_frame(), daily.recorder.to_frame())
+
+
+def test_speed_modifiers_follow_scheduled_law_changes():
+    game = make_game(economic_law="civilian_economy")
+    game.simulate_days(10)
+    before = {bt: game.get_construction_speed_modifier(1, bt) for bt in ("civilian_factory", "military_factory", "bunker")}
+    game.law_manager.law_changes = [LawChange(20, "economic", "war_economy")]
+    game.simulate_days(9)
+    assert {bt: game.get_construction_speed_modifier(1, bt) for bt in before} == before
+    game.simulate_days(1)
+    expected = make_game(economic_law="war_economy")
+    expected.simulate_days(20)
+    for state_id in (1, 2):
+        for bt in before:
+            assert game.get_construction_speed_modifier(state_id, bt) == expected.get_construction_speed_modifier(state_id, bt)
+    assert game.get_construction_speed_modifier(1, "civilian_factory") > before["civilian_factory"]
+
+
+@pytest.mark.parametrize("field, value", [("infrastructure", 5), ("state_bonus", 0.2), ("has_dam", True)])
+def test_speed_cache_is_invalidated_by_state_speed_fields(field, value):
+    game = make_game()
+    branch = game.fork()
+    before = game.get_construction_speed_modifier(2, "civilian_factory")
+    version = branch.states[2].speed_version
+    setattr(branch.states[2], field, value)
+    assert branch.states[2].speed_version == version + 1
+    assert branch.get_construction_speed_modifier(2, "civilian_factory") > before
+    assert game.get_construction_speed_modifier(2, "civilian_factory") == before
+    assert game.states[2].speed_version == version
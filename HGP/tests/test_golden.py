@@ -0,0 +1,18 @@
+import json
+import os
+from src.golden import run_harness
+
+SETTINGS = os.path.join(os.path.dirname(__file__), os.pardir, "settings.json")
+
+
+def test_engines_match_the_reference_on_a_reduced_harness():
+    with open(SETTINGS) as f:
+        settings = json.load(f)
+    # Full-length runs, so the random queues run out and the days with spare factories are compared too
+    report = run_harness(settings, random_scenarios=3, seed=10)
+    mismatches = {
+        (scenario, engine): differences[:3]
+        for scenario, engines in report.items() for engine, differences in engines.items() if differences
+    }
+    assert "batch_lockstep" in report["law_changes_day_45"]
+    assert mismatches == {}
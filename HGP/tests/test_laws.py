@@ -0,0 +1,47 @@
+import pytest
+from src.laws import LawChange, LawManager
+
+
+def construction_speed(laws: LawManager, day: int) -> float:
+    return laws.timeline().at(day)["construction_speed"]
+
+
+def test_timeline_follows_law_changes():
+    laws = LawManager("free_trade", "volunteer_only", "civilian_economy")
+    before = construction_speed(laws, 50)
+    laws.law_changes = [LawChange(100, "trade", "closed_economy")]
+    assert construction_speed(laws, 50) == before
+    assert construction_speed(laws, 100) == pytest.approx(before - 0.15)
+    laws.apply_law_change(200, "economic", "war_economy")
+    assert construction_speed(laws, 200) == pytest.approx(before - 0.15 + 0.3)
+    laws.apply_modifier_change(300, 0.1, "national spirit")
+    assert laws.timeline().at(300)["global"] == pytest.approx(0.1)
+
+
+def test_schedules_cannot_be_edited_in_place():
+    laws = LawManager("free_trade", "volunteer_only", "civilian_economy")
+    laws.apply_law_change(100, "trade", "closed_economy")
+    with pytest.raises(AttributeError):
+        laws.law_changes.append(LawChange(200, "trade", "free_trade"))
+    with pytest.raises(AttributeError):
+        laws.law_changes[0].day = 50
+
+
+def test_stability_and_war_support_recompile_the_timeline():
+    laws = LawManager("free_trade", "volunteer_only", "civilian_economy", stability=50.0)
+    base = construction_speed(laws, 0)
+    laws.stability = 25.0
+    unstable = construction_speed(laws, 0)
+    assert unstable != base
+    laws.war_support = 50.0
+    assert construction_speed(laws, 0) == pytest.approx(unstable + 0.05)
+
+
+def test_fork_edits_leave_the_original_timeline():
+    laws = LawManager("free_trade", "volunteer_only", "civilian_economy")
+    expected = laws.timeline().values
+    branch = laws.fork()
+    branch.apply_law_change(10, "trade", "closed_economy")
+    branch.stability = 0.0
+    assert laws.timeline().values == expected
+    assert branch.timeline().values != expected
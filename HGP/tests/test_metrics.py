@@ -0,0 +1,55 @@
+import pickle
+from src.metrics import COLUMNS, MetricsRecorder
+from tests.test_game import make_game
+
+
+def values(civ: int, queue: int = 1) -> tuple:
+    return (civ, 0, 0, civ, 0.0, 0.0, queue)
+
+
+def test_rows_are_only_added_when_a_value_changes():
+    recorder = MetricsRecorder(capacity=1)
+    recorder.record_values(1, values(5))
+    recorder.record_values(2, values(5))
+    recorder.record_values(3, values(7), days=10)
+    recorder.record_values(13, values(6))
+    assert len(recorder) == 3 and recorder.last_day == 13
+    assert recorder.days[:3].tolist() == [1, 3, 13]
+    assert [recorder.value("total_civ_factories", day) for day in (1, 2, 12, 13)] == [5, 5, 7, 6]
+    assert recorder.value("total_civ_factories", 14) is None and recorder.at(0) is None
+    assert recorder.at(5)["queue_length"] == 1
+    frame = recorder.to_frame(daily=True)
+    assert list(frame.index) == list(range(1, 14)) and list(frame.columns) == list(COLUMNS)
+
+
+def test_running_max_answers_first_day_queries():
+    recorder = MetricsRecorder()
+    for day, civ in enumerate([5, 8, 6, 9, 9, 4], start=1):
+        recorder.record_values(day, values(civ))
+    assert recorder.first_day_at_least("total_civ_factories", 5) == 1
+    assert recorder.first_day_at_least("total_civ_factories", 7) == 2
+    assert recorder.first_day_at_least("total_civ_factories", 9) == 4
+    assert recorder.first_day_at_least("total_civ_factories", 10) is None
+
+
+def test_copies_are_independent():
+    recorder = MetricsRecorder()
+    recorder.record_values(1, values(5))
+    for clone in (recorder.copy(), pickle.loads(pickle.dumps(recorder))):
+        clone.record_values(2, values(6))
+        assert len(clone) == 2 and len(recorder) == 1
+        assert clone.to_frame().iloc[0].equals(recorder.to_frame().iloc[0])
+
+
+def test_game_recorder_matches_daily_values():
+    game = make_game()
+    game.recorder = MetricsRecorder()
+    civ, queue = [], []
+    for _ in range(400):
+        game.simulate_days(1)
+        civ.append(game.total_civ_factories)
+        queue.append(len(game.construction_queue))
+    assert len(game.recorder) < 20
+    frame = game.recorder.to_frame(daily=True)
+    assert frame["total_civ_factories"].tolist() == civ
+    assert frame["queue_length"].tolist() == queue
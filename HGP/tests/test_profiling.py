@@ -0,0 +1,49 @@
+import threading
+from src.profiling import PHASES, PhaseTimer
+from tests.test_game import make_game
+
+
+def test_timer_counts_simulated_days():
+    game = make_game()
+    with PhaseTimer() as timer:
+        game.simulate_days(100)
+        game.simulate_days_fast(200)
+    assert timer.days == 300
+    assert timer.calls["run (daily)"] == 1 and timer.calls["run (event-driven)"] == 1
+
+
+def test_timers_on_concurrent_threads_only_see_their_own_runs():
+    originals = {method: cls.__dict__[method] for cls, method, _ in PHASES}
+    days = [150, 400]
+    timers = [PhaseTimer() for _ in days]
+    both_enabled = threading.Barrier(len(days))
+    errors = []
+
+    def run(timer, n):
+        try:
+            with timer:
+                both_enabled.wait(timeout=10)
+                make_game().simulate_days(n)
+                both_enabled.wait(timeout=10)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=args) for args in zip(timers, days)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert [timer.days for timer in timers] == days
+    assert [timer.calls["day step"] for timer in timers] == days
+    # The last timer to stop puts the original methods back
+    assert {method: cls.__dict__[method] for cls, method, _ in PHASES} == originals
+
+
+def test_every_phase_of_a_daily_run_is_reported():
+    game = make_game()
+    with PhaseTimer() as timer:
+        game.simulate_days(100)
+    frame = timer.to_frame()
+    for phase in ["run (daily)", "day step", "modifiers", "speed modifier", "consumer goods"]:
+        assert phase in frame.index
@@ -0,0 +1,32 @@
+import math
+from src.schedule import project_schedule
+from tests.test_game import make_game
+
+
+def test_schedule_matches_a_daily_run():
+    game = make_game()
+    game.add_to_queue(3, "civilian_factory", 2)
+    schedule = project_schedule(game)
+    started, finished = {}, {}
+    daily = game.fork()
+    while daily.construction_queue:
+        queued = {p.uid for p in daily.construction_queue}
+        daily.simulate_days(1)
+        for project in daily.construction_queue:
+            if project.factories_assigned:
+                started.setdefault(project.uid, daily.current_day)
+        for uid in queued - {p.uid for p in daily.construction_queue}:
+            finished[uid] = daily.current_day
+    assert schedule["uid"].tolist() == [p.uid for p in game.construction_queue]
+    assert dict(zip(schedule["uid"], schedule["finish_day"])) == finished
+    for uid, start in zip(schedule["uid"], schedule["start_day"]):
+        assert start == started.get(uid, finished[uid])
+
+
+def test_schedule_leaves_the_game_alone_and_caps_the_horizon():
+    game = make_game()
+    schedule = project_schedule(game, max_days=100)
+    assert game.current_day == 0 and len(game.construction_queue) == 3
+    assert math.isnan(schedule["finish_day"].iloc[-1])
+    schedule.loc[0, "finish_day"] = -1
+    assert project_schedule(game, max_days=100)["finish_day"].iloc[0] != -1
@@ -0,0 +1,32 @@
+import pytest
+from src.waste import COUNTERS, WasteLedger
+from tests.test_game import make_game
+
+
+def test_totals_match_the_rows():
+    ledger = WasteLedger()
+    ledger.overflow(3, 1, "civilian_factory", 12.5)
+    ledger.overflow(3, 1, "civilian_factory", 0.0)
+    ledger.idle(4, 2, days=3, state_id=1, building_type="civilian_factory", cap_lost=1.5)
+    ledger.idle(7, 2, state_id=1, building_type="civilian_factory", cap_lost=1.5)
+    ledger.idle(9, 5)
+    assert len(ledger) == 3
+    assert ledger.totals == {"wasted_points": 12.5, "idle_factory_days": 13, "cap_lost_points": 6.0}
+    frame = ledger.to_frame()
+    assert list(frame.index) == list(range(3, 10))
+    assert frame.sum().to_dict() == pytest.approx(ledger.totals)
+    assert ledger.to_frame(cumulative=True).iloc[-1].to_dict() == pytest.approx(ledger.totals)
+    assert ledger.by_source()[COUNTERS].sum().to_dict() == pytest.approx(ledger.totals)
+
+
+def test_daily_and_fast_runs_book_the_same_waste():
+    daily = make_game()
+    daily.states[1].buildings["civilian_factory"] = 40
+    daily.waste = WasteLedger()
+    fast = daily.fork()
+    daily.simulate_days(1500)
+    fast.simulate_days_fast(1500)
+    assert not daily.construction_queue
+    assert all(daily.waste.totals[name] > 0 for name in ("wasted_points", "idle_factory_days"))
+    assert fast.waste.totals == pytest.approx(daily.waste.totals)
+    assert fast.waste.rows == pytest.approx(daily.waste.rows)